@@ -0,0 +1,231 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import math
+import platform
+import random
+import subprocess
+import time
+
+import numpy as np
+import pygame
+
+from pygame_template import Group, V2
+from broadphase import SpatialHash
+from collisions import Circle, Polygon, Rect
+from world import SoftBodyWorld
+from bodies import grid_template, ring_template, spawn
+from classes import Particle, Shape
+
+
+GRID_SIZES = [(16, 9), (50, 50), (100, 100), (200, 200)]
+COLLIDABLE_COUNTS = [10, 100, 1000, 5000]
+
+
+def best_time(fn, number: int, repeat: int = 5) -> float:
+    # best-of-repeat seconds per call
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number): fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def grid_world(width: int, height: int, spacing: float = 50) -> SoftBodyWorld:
+    world = SoftBodyWorld(capacity=width * height)
+    spawn(grid_template(width, height, spacing), world)
+    return world
+
+
+# ===== Solver =====
+
+def bench_solver(sizes) -> list[dict]:
+    results = []
+    for width, height in sizes:
+        world = grid_world(width, height)
+        def step():
+            world.apply_force()
+            world.step(1.0)
+        seconds = best_time(step, number=max(1, 20000 // (width * height)))
+        results.append({
+            "grid": f"{width}x{height}",
+            "particles": world.particle_count,
+            "springs": world.spring_count,
+            "steps_per_sec": 1 / seconds,
+            "us_per_spring": seconds * 1e6 / world.spring_count,
+        })
+    return results
+
+
+def bench_legacy_solver() -> dict:
+    # the per-object Spring.update / Particle.update path, for comparison against world.step
+    particles, springs, draw_layer = Group(), Group(), Group()
+    world = SoftBodyWorld()
+    Shape.get_jelly_quad(particles, springs, draw_layer, world)
+    def step():
+        for spring in springs: spring.update(1.0)
+        for particle in particles: particle.update(1.0)
+    seconds = best_time(step, number=5)
+    return {"grid": "16x9", "springs": world.spring_count, "steps_per_sec": 1 / seconds, "us_per_spring": seconds * 1e6 / world.spring_count}
+
+
+# ===== Broad phase =====
+
+def bench_collidables(counts, particles: int = 200) -> list[dict]:
+    results = []
+    rng = random.Random(0)
+    for count in counts:
+        group, world = Group(), SoftBodyWorld()
+        side = 40 * count ** 0.5
+        for _ in range(count):
+            Rect(V2(rng.uniform(0, side), rng.uniform(0, side)), V2(rng.uniform(10, 60), rng.uniform(10, 60)), group)
+        broadphase = SpatialHash(64)
+        for rect in group: broadphase.insert(rect)
+        parts = [Particle(V2(rng.uniform(0, side), rng.uniform(0, side)), 10, False, world=world) for _ in range(particles)]
+        start = world.pos[:particles].copy()
+
+        def scan(collidables):
+            def run():
+                world.pos[:particles] = start
+                for p in parts: p.collition_check_and_resolve(collidables)
+            return run
+        results.append({
+            "collidables": count,
+            "us_per_particle_scan": best_time(scan(group), 1, 3) * 1e6 / particles,
+            "us_per_particle_hashed": best_time(scan(broadphase), 1, 3) * 1e6 / particles,
+        })
+    return results
+
+
+# ===== Narrow phase =====
+
+def shape_pairs() -> dict:
+    hexagon = [V2(30 * math.cos(a), 30 * math.sin(a)) for a in np.linspace(0, 2 * math.pi, 6, endpoint=False)]
+    make = {
+        "circle": lambda p: Circle(25, V2(p)),
+        "rect": lambda p: Rect(V2(p), V2(50, 50)),
+        "polygon": lambda p: Polygon(hexagon, V2(p)),
+    }
+    return {(a, b): (make[a]((100, 100)), make[b]((120, 110))) for a in make for b in make}
+
+
+def bench_narrow_phase(number: int = 2000) -> list[dict]:
+    results = []
+    for (kind_a, kind_b), (a, b) in shape_pairs().items():
+        home = V2(a.pos)
+        def reset():
+            a.pos = V2(home)
+            a.rect.center = a.pos
+        check = getattr(a, f"check_collision_{kind_b}")
+        resolve = getattr(a, f"resolve_collision_{kind_b}")
+        reset_cost = best_time(reset, number)
+        def resolve_from_home():
+            reset()
+            resolve(b)
+        results.append({
+            "pair": f"{kind_a}-{kind_b}",
+            "hit": bool(check(b)),
+            "us_per_check": best_time(lambda: check(b), number) * 1e6,
+            "us_per_resolve": max(0.0, best_time(resolve_from_home, number) - reset_cost) * 1e6,
+        })
+    return results
+
+
+# ===== Shape builders =====
+
+def bench_builders() -> list[dict]:
+    results = []
+    for name in ("get_jelly_quad", "get_jelly_circle"):
+        builder = getattr(Shape, name)
+        seconds = best_time(lambda: builder(Group(), Group(), Group(), SoftBodyWorld()), 3, 3)
+        results.append({"builder": name, "ms_per_body": seconds * 1e3})
+
+    # templates: the first build pays for the topology, later spawns copy cached arrays
+    for builder, args in ((grid_template, (16, 9, 50)), (ring_template, ())):
+        name = builder.__name__
+        builder.cache_clear()
+        world = SoftBodyWorld()
+        start = time.perf_counter()
+        spawn(builder(*args), world)
+        cold = time.perf_counter() - start
+        seconds = best_time(lambda: spawn(builder(*args), world), 20, 3)
+        results.append({"builder": f"{name} first", "ms_per_body": cold * 1e3})
+        results.append({"builder": f"{name} cached", "ms_per_body": seconds * 1e3})
+    return results
+
+
+# ===== Rendering =====
+
+def bench_renderer(sizes) -> list[dict]:
+    from renderer import BatchRenderer
+
+    results = []
+    screen = pygame.Surface((1280, 720))
+    for width, height in sizes:
+        world = grid_world(width, height, spacing=1280 / width)
+        renderer = BatchRenderer(world)
+        renderer.paths()
+        results.append({
+            "grid": f"{width}x{height}",
+            "spring_level": renderer.spring_level(),
+            "polylines": len(renderer.paths()),
+            "ms_per_frame": best_time(lambda: renderer.draw(screen), 1, 3) * 1e3,
+        })
+    return results
+
+
+# ===== Reporting =====
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"commit": commit, "python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "processor": platform.processor(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def run_all(quick: bool = False) -> dict:
+    sizes = GRID_SIZES[:2] if quick else GRID_SIZES
+    counts = COLLIDABLE_COUNTS[:2] if quick else COLLIDABLE_COUNTS
+    return {
+        "environment": environment(),
+        "solver": bench_solver(sizes),
+        "legacy_solver": bench_legacy_solver(),
+        "collidables": bench_collidables(counts),
+        "narrow_phase": bench_narrow_phase(200 if quick else 2000),
+        "builders": bench_builders(),
+        "renderer": bench_renderer(sizes),
+    }
+
+
+def print_table(title: str, rows: list[dict]):
+    print(f"\n===== {title} =====")
+    if not rows: return
+    keys = list(rows[0])
+    print("  ".join(f"{k:>22}" for k in keys))
+    for row in rows:
+        print("  ".join(f"{v:>22.3f}" if isinstance(v, float) else f"{str(v):>22}" for v in row.values()))
+
+
+def print_report(results: dict):
+    print(" ".join(f"{k}={v}" for k, v in results["environment"].items()))
+    for section, rows in results.items():
+        if section == "environment": continue
+        print_table(section, rows if isinstance(rows, list) else [rows])
+
+
+def compare(old: dict, new: dict):
+    # ratio new/old for every numeric field of matching rows, > 1 means the number went up
+    print("\n===== compare (new / old) =====")
+    for section, rows in new.items():
+        if section == "environment" or section not in old: continue
+        old_rows = old[section] if isinstance(old[section], list) else [old[section]]
+        for row, old_row in zip(rows if isinstance(rows, list) else [rows], old_rows):
+            label = next(iter(row.values()))
+            ratios = [f"{k} x{v / old_row[k]:.2f}" for k, v in row.items()
+                      if isinstance(v, float) and isinstance(old_row.get(k), float) and old_row[k]]
+            print(f"{section:>14} {str(label):>14}  " + "  ".join(ratios))
@@ -0,0 +1,135 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+from world import SoftBodyWorld
+
+
+# ===== Templates =====
+# A body's topology as plain arrays, built once per parameter set and cached. Positions are local,
+# spawning adds an offset and copies everything into the world with one batched call per field.
+
+class BodyTemplate(NamedTuple):
+    positions: np.ndarray       # (n, 2), local coordinates
+    radius: np.ndarray          # (n,)
+    a: np.ndarray               # (m,) spring endpoints, indices into positions
+    b: np.ndarray
+    k: np.ndarray               # (m,)
+    damping: np.ndarray
+    level: np.ndarray           # 0 structural, 1 shear, 2 bend; used for LOD
+
+
+# per level: the grid offsets it connects and their stiffness
+Stencils = tuple[tuple[tuple[tuple[int, int], ...], float], ...]
+
+QUAD_STENCILS: Stencils = (
+    (((1, 0), (0, 1)), 0.3),     # structural
+    (((1, 1), (-1, 1)), 0.22),   # shear
+    (((2, 0), (0, 2)), 0.15),    # bend
+)
+
+
+def frozen(*arrays) -> list[np.ndarray]:
+    # cached templates are shared, keep callers from editing them in place
+    for array in arrays: array.flags.writeable = False
+    return list(arrays)
+
+def lattice_springs(present: np.ndarray, stencils: Stencils, damping: float):
+    # springs between the present nodes of a row-major lattice, ordered by first endpoint like a per-node loop
+    height, width = present.shape
+    index = np.full(present.shape, -1, dtype=np.intp)
+    index[present] = np.arange(present.sum())
+    y, x = np.nonzero(present)
+    a, b, k, level = [], [], [], []
+    for lvl, (offsets, stiffness) in enumerate(stencils):
+        for dx, dy in offsets:
+            nx, ny = x + dx, y + dy
+            inside = (0 <= nx) & (nx < width) & (0 <= ny) & (ny < height)
+            i = index[y[inside], x[inside]]
+            j = index[ny[inside], nx[inside]]
+            keep = (j >= 0) & (i < j)
+            a.append(i[keep])
+            b.append(j[keep])
+            k.append(np.full(keep.sum(), stiffness))
+            level.append(np.full(keep.sum(), lvl, dtype=np.int8))
+    a, b, k, level = (np.concatenate(parts) for parts in (a, b, k, level))
+    order = np.argsort(a, kind="stable")
+    return a[order], b[order], k[order], np.full(len(a), damping), level[order]
+
+@lru_cache(maxsize=64)
+def grid_template(width: int, height: int, spacing: float = 50, stencils: Stencils = QUAD_STENCILS,
+                  radius: float = 10, damping: float = 0.01) -> BodyTemplate:
+    # top left node at the origin
+    xs, ys = np.meshgrid(np.arange(width), np.arange(height))
+    positions = np.stack([xs.ravel(), ys.ravel()], axis=1) * float(spacing)
+    springs = lattice_springs(np.ones((height, width), dtype=bool), stencils, damping)
+    return BodyTemplate(*frozen(positions, np.full(len(positions), float(radius)), *springs))
+
+@lru_cache(maxsize=64)
+def polygon_template(points: tuple[tuple[float, float], ...], spacing: float = 50, stencils: Stencils = QUAD_STENCILS,
+                     radius: float = 10, damping: float = 0.01) -> BodyTemplate:
+    # the lattice nodes that fall inside the polygon, in the polygon's own coordinates
+    vertices = np.array(points, dtype=float)
+    left, top = vertices.min(axis=0)
+    right, bottom = vertices.max(axis=0)
+    xs, ys = np.meshgrid(np.arange(left, right + 1e-9, spacing), np.arange(top, bottom + 1e-9, spacing))
+
+    # even-odd crossing test over every node and edge at once
+    px, py = xs[..., None], ys[..., None]
+    x1, y1 = vertices[:, 0], vertices[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    straddles = (y1 > py) != (y2 > py)
+    crossing = x1 + (py - y1) * (x2 - x1) / np.where(y2 != y1, y2 - y1, 1)
+    present = ((straddles & (px < crossing)).sum(axis=-1) % 2).astype(bool)
+
+    # the crossing test is half open, nodes on the right and bottom edges count as outside; keep every node on an edge
+    ex, ey = x2 - x1, y2 - y1
+    t = np.clip(((px - x1) * ex + (py - y1) * ey) / np.maximum(ex * ex + ey * ey, 1e-12), 0, 1)
+    on_edge = ((x1 + ex * t - px) ** 2 + (y1 + ey * t - py) ** 2).min(axis=-1) <= (1e-6 * spacing) ** 2
+    present |= on_edge
+
+    positions = np.stack([xs[present], ys[present]], axis=1)
+    springs = lattice_springs(present, stencils, damping)
+    return BodyTemplate(*frozen(positions, np.full(len(positions), float(radius)), *springs))
+
+@lru_cache(maxsize=64)
+def ring_template(radius_outer: float = 100, radius_inner: float = 30, num_outer: int = 15, num_inner: int = 7,
+                  radius: float = 10, damping: float = 0.1, web_step: int = 4) -> BodyTemplate:
+    # centered on the origin: an outer ring, an inner ring (one center particle if num_inner <= 1),
+    # a web from every inner to every outer particle and cross braces inside each ring
+    def ring(r, count):
+        angle = np.radians(np.arange(count) / count * 360)
+        return np.stack([r * np.sin(angle), r * np.cos(angle)], axis=1)
+
+    inner = ring(radius_inner, num_inner) if num_inner > 1 else np.zeros((1, 2))
+    positions = np.concatenate([ring(radius_outer, num_outer), inner])
+    outer = np.arange(num_outer)
+    inner = np.arange(len(inner)) + num_outer
+    count_inner = len(inner)
+
+    a, b, k, level = [], [], [], []
+    def connect(i, j, stiffness, lvl):
+        a.append(i)
+        b.append(j)
+        k.append(np.full(len(i), stiffness))
+        level.append(np.full(len(i), lvl, dtype=np.int8))
+
+    connect(outer, np.roll(outer, -1), 0.5, 0)                              # perimeter, outer ring
+    connect(inner[np.arange(num_inner) % count_inner], inner[(np.arange(num_inner) + 1) % count_inner], 0.5, 0)
+    connect(np.repeat(inner, num_outer), np.tile(outer, count_inner), 1, 1)  # inner to outer web
+    connect(outer, np.roll(outer, -web_step), 1.5, 2)                       # outer cross braces
+    connect(inner[np.arange(num_inner) % count_inner], inner[(np.arange(num_inner) + 2) % count_inner], 0.1, 2)
+
+    a, b, k, level = (np.concatenate(parts) for parts in (a, b, k, level))
+    return BodyTemplate(*frozen(positions, np.full(len(positions), float(radius)), a, b, k, np.full(len(a), damping), level))
+
+
+# ===== Spawning =====
+
+def spawn(template: BodyTemplate, world: SoftBodyWorld, offset=(0, 0)) -> tuple[np.ndarray, np.ndarray]:
+    # returns the new particle and spring indices
+    start = world.particle_count
+    particles = world.add_particles(template.positions + np.asarray(offset, dtype=float), template.radius)
+    springs = world.add_springs(template.a + start, template.b + start, template.k, template.damping, template.level)
+    return particles, springs
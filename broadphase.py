@@ -0,0 +1,65 @@
+from math import floor
+
+
+class SpatialHash:
+    def __init__(self, cell_size: float = 64):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], dict] = {}
+        self.ranges: dict = {}
+
+    def __len__(self): return len(self.ranges)
+    def __iter__(self): return iter(self.ranges)
+    def __contains__(self, shape): return shape in self.ranges
+
+    def cell_range(self, left, top, right, bottom) -> tuple[int, int, int, int]:
+        s = self.cell_size
+        return floor(left / s), floor(top / s), floor(right / s), floor(bottom / s)
+
+    # MEMBERSHIP
+
+    def insert(self, shape):
+        r = shape.rect
+        cells = self.cell_range(r.left, r.top, r.right, r.bottom)
+        self.ranges[shape] = cells
+        x0, y0, x1, y1 = cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), {})[shape] = None
+        shape.broadphase = self
+
+    def remove(self, shape):
+        x0, y0, x1, y1 = self.ranges.pop(shape)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = self.cells[(cx, cy)]
+                del bucket[shape]
+                if not bucket: del self.cells[(cx, cy)]
+        shape.broadphase = None
+
+    def update(self, shape):
+        # only re-bucket when the shape actually crossed a cell boundary
+        r = shape.rect
+        if self.ranges.get(shape) == self.cell_range(r.left, r.top, r.right, r.bottom): return
+        self.remove(shape)
+        self.insert(shape)
+
+    # QUERIES
+
+    def query_box(self, left, top, right, bottom) -> list:
+        x0, y0, x1, y1 = self.cell_range(left, top, right, bottom)
+        found = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket: found.update(bucket)
+        return [s for s in found if s.rect.right >= left and s.rect.left <= right and s.rect.bottom >= top and s.rect.top <= bottom]
+
+    def query(self, rect) -> list:
+        return self.query_box(rect.left, rect.top, rect.right, rect.bottom)
+
+    def query_circle(self, pos, radius) -> list:
+        x, y = pos
+        return self.query_box(x - radius, y - radius, x + radius, y + radius)
+
+    def query_shape(self, shape) -> list:
+        return [s for s in self.query(shape.rect) if s is not shape]
@@ -1,51 +1,156 @@
-from collisions import *
+import pygame
+
+from pygame_template import APP, Color, Group, Sprite, V2
+from broadphase import SpatialHash
+from collisions import Circle, TimeOfImpact, collide, separate, sweep_to_first_hit
+from world import ParticleRef, SoftBodyWorld
+from bodies import BodyTemplate, grid_template, ring_template, spawn
 
 class Particle(Circle):
-    def __init__(self, pos:V2, radius = 10, fixed = False, *groups):
+    def __init__(self, pos:V2, radius = 10, fixed = False, *groups, world: SoftBodyWorld = None, index: int = None):
+        self.world = world if world is not None else SoftBodyWorld.default()
+        # an index wraps a particle already in the world, e.g. one spawned from a template
+        self.index = self.world.add_particle(pos, radius, fixed) if index is None else index
         super().__init__(radius, pos, *groups)
 
-        self.pos = pos
-        self.fixed = fixed
-        self.radius = radius
-        self.velocity = V2()
-        self.force = V2()
+    # ===== Views into the world arrays =====
+    @property
+    def pos(self) -> V2: return V2(*self.world.pos[self.index])
+    @pos.setter
+    def pos(self, value): self.world.pos[self.index] = value
+
+    @property
+    def render_pos(self) -> V2:
+        render_pos = self.world.render_pos
+        if render_pos is None or self.index >= len(render_pos): return self.pos
+        return V2(*render_pos[self.index])
+
+    @property
+    def velocity(self) -> V2: return V2(*self.world.velocity[self.index])
+    @velocity.setter
+    def velocity(self, value): self.world.velocity[self.index] = value
+
+    @property
+    def force(self) -> V2: return V2(*self.world.force[self.index])
+    @force.setter
+    def force(self, value): self.world.force[self.index] = value
+
+    @property
+    def radius(self) -> float: return float(self.world.radius[self.index])
+    @radius.setter
+    def radius(self, value): self.world.radius[self.index] = value
+
+    @property
+    def fixed(self) -> bool: return bool(self.world.fixed[self.index])
+    @fixed.setter
+    def fixed(self, value): self.world.fixed[self.index] = value
 
     def draw(self, screen):
-        pygame.draw.circle(screen, Color.gray60, self.pos, self.radius)
-        pygame.draw.circle(screen, Color.black, self.pos, self.radius, 2)
+        pos = self.render_pos
+        pygame.draw.circle(screen, Color.gray60, pos, self.radius)
+        pygame.draw.circle(screen, Color.black, pos, self.radius, 2)
     
     def update(self, dt):
         if not self.fixed:
-            self.velocity += self.force * dt
-            self.velocity *= 0.998
+            self.velocity = (self.velocity + self.force * dt) * self.world.drag_factor(dt)
             self.pos += self.velocity * dt
         self.force = V2()
 
     def apply_force(self, force=V2(0,0.1)):
-        self.force += force
+        self.world.apply_force_at(self.index, tuple(force))
 
     def ground_pound(self, level: int | float):
         if self.pos.y + self.radius >= level:
-            self.pos.y = level - self.radius
-            self.velocity.y = 0
-
-    def collition_check_and_resolve(self, collidables:Group):
-        for rect in collidables:
-            if self.check_collision_rect(rect):
-                self.resolve_collision_rect(rect)
+            self.world.pos[self.index, 1] = level - self.radius
+            self.world.velocity[self.index, 1] = 0
+
+    def collition_check_and_resolve(self, collidables: Group | SpatialHash | list) -> int:
+        if isinstance(collidables, SpatialHash):
+            collidables = collidables.query_circle(self.pos, self.radius)
+        hits = 0
+        for shape in collidables:
+            contact = collide(self, shape)
+            if contact:
+                separate(self, contact)
                 self.velocity = V2()
+                hits += 1
+        return hits
+
+    def sweep_and_resolve(self, start: V2, collidables: Group | SpatialHash | list, keep_tangent: bool = False) -> TimeOfImpact | None:
+        hit = super().sweep_and_resolve(start, collidables)
+        if hit: stop_at_surface(self, hit, keep_tangent)
+        return hit
+
+
+class ParticleCollider(ParticleRef):
+    # a particle without a sprite: a circle over the world arrays for collide and sweep, which is
+    # all a scene needs of bodies BatchRenderer draws from the arrays anyway. pos and velocity are V2 here
+    __slots__ = ()
+    kind = "circle"
+
+    @property
+    def pos(self) -> V2: return V2(*self.world.pos[self.index])
+    @pos.setter
+    def pos(self, value): self.world.pos[self.index] = value
+
+    @property
+    def velocity(self) -> V2: return V2(*self.world.velocity[self.index])
+    @velocity.setter
+    def velocity(self, value): self.world.velocity[self.index] = value
+
+    def collition_check_and_resolve(self, collidables: Group | SpatialHash | list) -> int:
+        if isinstance(collidables, SpatialHash):
+            collidables = collidables.query_circle(self.pos, self.radius)
+        hits = 0
+        for shape in collidables:
+            contact = collide(self, shape)
+            if contact:
+                self.pos += contact.normal * contact.depth
+                self.velocity = V2()
+                hits += 1
+        return hits
+
+    def sweep_and_resolve(self, start: V2, collidables: Group | SpatialHash | list, keep_tangent: bool = False) -> TimeOfImpact | None:
+        hit = sweep_to_first_hit(self, start, collidables)
+        if hit: stop_at_surface(self, hit, keep_tangent)
+        return hit
+
+
+def stop_at_surface(particle: Particle | ParticleCollider, hit: TimeOfImpact, keep_tangent: bool):
+    if keep_tangent:
+        # only stop the approach, the contact solver owns bounce and friction
+        velocity = particle.velocity
+        approach = velocity.dot(hit.normal)
+        if approach < 0: particle.velocity = velocity - hit.normal * approach
+    else:
+        particle.velocity = V2()
 
 
 
 class Spring(Sprite):
-    def __init__(self, a: Particle, b: Particle, k = 1, damping = 0.01, *groups):
+    def __init__(self, a: Particle, b: Particle, k = 1, damping = 0.01, *groups, level = 0, index: int = None):
         super().__init__(*groups)
+        if a.world is not b.world: raise ValueError("Spring endpoints must belong to the same SoftBodyWorld")
 
         self.a = a
         self.b = b
-        self.k = k
-        self.damping = damping
-        self.rest_len = (a.pos - b.pos).length()
+        self.world = a.world
+        self.index = self.world.add_spring(a.index, b.index, k, damping, level) if index is None else index
+
+    @property
+    def k(self) -> float: return float(self.world.k[self.index])
+    @k.setter
+    def k(self, value): self.world.k[self.index] = value
+
+    @property
+    def damping(self) -> float: return float(self.world.damping[self.index])
+    @damping.setter
+    def damping(self, value): self.world.damping[self.index] = value
+
+    @property
+    def rest_len(self) -> float: return float(self.world.rest_len[self.index])
+    @rest_len.setter
+    def rest_len(self, value): self.world.rest_len[self.index] = value
 
     def update(self, dt):
         delta = self.a.pos - self.b.pos
@@ -61,88 +166,31 @@ class Spring(Sprite):
         if not self.b.fixed: self.b.force -= force
 
     def draw(self, screen):
-        pygame.draw.line(screen, Color.white, self.a.pos, self.b.pos, 1)
+        pygame.draw.line(screen, Color.white, self.a.render_pos, self.b.render_pos, 1)
 
 
 
 class Shape:
     @staticmethod
-    def get_jelly_circle(particles: Group, springs: Group, draw_layer: Group):
-        s, c, rad = math.sin, math.cos, math.radians
-        radius_outer = 100
-        radius_inner = 30
-        num_outer = 15
-        num_inner = 7
-        center = V2(APP.HW, APP.HH)
-
-        outer_parts = []
-        inner_parts = []
-
-        # ===== Outer Circle Particles =====
-        for i in range(num_outer):
-            angle = (i / num_outer) * 360
-            pos = V2(radius_outer * s(rad(angle)), radius_outer * c(rad(angle))) + center
-            outer_parts.append(Particle(pos, 10, False, particles, draw_layer))
-
-        # ===== Inner Circle Particles =====
-        if num_inner > 1:
-            for i in range(num_inner):
-                angle = (i / num_inner) * 360
-                pos = V2(radius_inner * s(rad(angle)), radius_inner * c(rad(angle))) + center
-                inner_parts.append(Particle(pos, 10, False, particles, draw_layer))
-        else:
-            inner_parts.append(Particle(center, 10, False, particles, draw_layer))
-
-        # ===== Springs =====
-
-        # Perimeter springs: Outer ring
-        for i in range(num_outer):
-            a = outer_parts[i]
-            b = outer_parts[(i + 1) % num_outer]
-            Spring(a, b, 0.5, 0.1, springs, draw_layer)
-
-        # Perimeter springs: Inner ring
-        for i in range(num_inner):
-            a = inner_parts[i]
-            b = inner_parts[(i + 1) % num_inner]
-            Spring(a, b, 0.5, 0.1, springs, draw_layer)
-
-        # Optional: Web connections (fully connect inner to all outer points)
-        for inner in inner_parts:
-            for outer in outer_parts:
-                Spring(inner, outer, 1, 0.1, springs, draw_layer)
-
-        # Optional: Web connections (webly connect outer points)
-        for i in range(len(outer_parts)):
-            Spring(outer_parts[i], outer_parts[(i+4)%len(outer_parts)], 1.5, 0.1, springs, draw_layer)
-
-        # Optional: Inner to inner full mesh (to avoid collapse)
-        for i in range(num_inner):
-                Spring(inner_parts[i], inner_parts[(i+2)%num_inner], 0.1, 0.1, springs, draw_layer)
+    def spawn(template: BodyTemplate, offset, particles: Group | None, springs: Group | None, draw_layer: Group | None,
+              world: SoftBodyWorld = None) -> list[Particle] | list[ParticleCollider]:
+        # the arrays go into the world in one batch, sprites only wrap them; springs=None skips
+        # the spring sprites, the world steps and BatchRenderer draws springs without them.
+        # particles=None skips every sprite and hands back ParticleColliders instead
+        world = world if world is not None else SoftBodyWorld.default()
+        indices, spring_indices = spawn(template, world, offset)
+        if particles is None: return [ParticleCollider(world, i) for i in indices.tolist()]
+        radius = world.radius
+        parts = [Particle(V2(*world.pos[i]), radius[i], False, particles, draw_layer, world=world, index=i) for i in indices.tolist()]
+        if springs is not None:
+            for i, a, b in zip(spring_indices.tolist(), template.a.tolist(), template.b.tolist()):
+                Spring(parts[a], parts[b], 1, 0.01, springs, draw_layer, index=i)
+        return parts
+
+    @staticmethod
+    def get_jelly_circle(particles: Group | None, springs: Group | None, draw_layer: Group | None, world: SoftBodyWorld = None) -> list:
+        return Shape.spawn(ring_template(), V2(APP.HW, APP.HH), particles, springs, draw_layer, world)
 
     @staticmethod
-    def get_jelly_quad(particles: Group, springs: Group, draw_layer: Group):
-        # ===== Particles =====
-        parts = []
-        grid_width = 16
-        grid_height = 9
-        for y in range(grid_height):
-            for x in range(grid_width): parts.append(Particle(V2(x * 50 + APP.HW - 300, y * 50 + 100), 10, False, particles, draw_layer))
-
-        # ===== Springs =====
-        spring_levels = [
-            ([(1, 0), (0, 1)], 0.3),   # structural
-            ([(1, 1), (-1, 1)], 0.22),  # shear
-            ([(2, 0), (0, 2)], 0.15)    # bend
-        ]
-        for i, p in enumerate(parts):
-            x = i % grid_width
-            y = i // grid_width
-            for connections, k in spring_levels:
-                    for dx, dy in connections:
-                        nx = x + dx
-                        ny = y + dy
-                        if 0 <= nx < grid_width and 0 <= ny < grid_height:
-                            neighbor_index = ny * grid_width + nx
-                            if i < neighbor_index: 
-                                Spring(p, parts[neighbor_index], k, 0.01, springs, draw_layer)
+    def get_jelly_quad(particles: Group | None, springs: Group | None, draw_layer: Group | None, world: SoftBodyWorld = None) -> list:
+        return Shape.spawn(grid_template(16, 9, 50), V2(APP.HW - 300, 100), particles, springs, draw_layer, world)
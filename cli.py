@@ -0,0 +1,211 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")       # no window for headless runs
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import time
+
+
+def cmd_simulate(args):
+    import numpy as np
+    from scene import Scene
+
+    scene = Scene(args.scene, substeps=args.substeps, workers=args.workers, solver=args.solver, ccd=not args.no_ccd,
+                  contact_iterations=args.contact_iterations)
+    scene.apply_gravity = not args.no_gravity
+    world = scene.world
+    if args.restore: scene.load(args.restore)
+
+    profiler = scene.profiler
+    if args.profile:
+        profiler.enabled = profiler.keep_all = True
+
+    recorder = None
+    if args.record:
+        from recording import Recorder
+        recorder = Recorder(args.record, world, scene.collidables)
+
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        scene.scheduler.tick()
+        if recorder: recorder.record()
+        profiler.end_frame()
+    elapsed = time.perf_counter() - start
+    if recorder: recorder.close()
+    scene.close()
+
+    n = world.particle_count
+    print(f"scene      {args.scene}")
+    print(f"particles  {n}")
+    print(f"springs    {world.spring_count}")
+    print(f"steps      {args.steps} x {args.substeps} substeps")
+    print(f"elapsed    {elapsed:.3f}s")
+    print(f"steps/sec  {args.steps / elapsed:.1f}" if elapsed else "steps/sec  inf")
+    print(f"centroid   {world.pos[:n].mean(axis=0).round(3).tolist()}")
+
+    if args.save:
+        np.save(args.save, world.pos[:n])
+    if args.snapshot:
+        scene.save(args.snapshot)
+    if args.profile:
+        print()
+        print(f"{'stage':<22}{'mean':>10}{'p95':>10}{'max':>10}")
+        for name, stats in profiler.summary(profiler.frames).items():
+            print(f"{name:<22}" + "".join(f"{stats[key]:>10.3f}" for key in ("mean", "p95", "max")))
+        profiler.export(args.profile)
+
+
+def cmd_replay(args):
+    import numpy as np
+    import pygame
+    from recording import Playback
+    from renderer import BatchRenderer
+
+    playback = Playback(args.recording)
+    pos, shapes = playback.frame(args.frame)
+    print(f"frames     {len(playback)}")
+    print(f"particles  {playback.particles}")
+    print(f"frame      {args.frame}")
+    print(f"centroid   {pos.mean(axis=0).round(3).tolist() if len(pos) else None}")
+
+    if args.save:
+        world = playback.world()
+        playback.seek(world, args.frame)
+        with np.load(args.recording + ".npz") as data: sizes = data["collidable_size"]
+        screen = pygame.Surface(args.size)
+        BatchRenderer(world).draw(screen)
+        for center, size in zip(shapes, sizes):
+            pygame.draw.rect(screen, (120, 120, 120), pygame.FRect((0, 0), size.tolist()).move_to(center=center.tolist()), 2)
+        pygame.image.save(screen, args.save)
+
+
+def cmd_serve(args):
+    import asyncio
+    from scene import Scene
+    from server import SimulationServer
+
+    scene = Scene(args.scene, substeps=args.substeps, workers=args.workers, solver=args.solver)
+    server = SimulationServer(scene, args.host, args.port, tick_rate=args.tick_rate)
+    print(f"serving {args.scene} on {args.host}:{args.port} at {args.tick_rate:g} ticks/sec")
+    try:
+        asyncio.run(server.run(args.ticks))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scene.close()
+    print(f"ticks      {server.tick}")
+    print(f"sent       {server.bytes_sent / 1024:.1f} KiB")
+
+
+def cmd_watch(args):
+    from server import SimulationClient
+
+    with SimulationClient(args.host, args.port) as client:
+        start = time.perf_counter()
+        received = 0
+        while received < args.ticks and not client.closed:
+            received += client.poll(timeout=1)
+            if args.move and not client.closed: client.send_input(args.move)     # poll closes it when the server is gone
+        elapsed = time.perf_counter() - start
+        world = client.world
+        n = world.particle_count if world else 0
+        print(f"ticks      {received} (server tick {client.tick})")
+        print(f"particles  {n}")
+        print(f"received   {client.bytes_received / 1024:.1f} KiB, {client.bytes_received / max(received, 1):.0f} B/tick")
+        print(f"ticks/sec  {received / elapsed:.1f}" if elapsed else "ticks/sec  inf")
+        if n: print(f"centroid   {world.pos[:n].mean(axis=0).round(3).tolist()}")
+        if len(client.collidable_pos): print(f"platform   {client.collidable_pos[-1].round(3).tolist()}")
+
+
+def cmd_bench(args):
+    import json
+    import bench
+
+    results = bench.run_all(quick=args.quick)
+    bench.print_report(results)
+    if args.compare:
+        with open(args.compare) as f: bench.compare(json.load(f), results)
+    if args.json:
+        with open(args.json, "w") as f: json.dump(results, f, indent=2)
+
+
+def cmd_parity(args):
+    import sys
+    import bench
+    import parity
+
+    print(f"backend {parity.backend()}")
+    rows = parity.run_all(cases=args.cases, seed=args.seed)
+    bench.print_table("parity", rows)
+    if not all(row["passed"] for row in rows): sys.exit(1)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from scene import SCENES
+
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Spring particle physics without a display")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sim = commands.add_parser("simulate", help="step a scene as fast as possible, no drawing")
+    sim.add_argument("--scene", choices=sorted(SCENES), default="jelly_quad")
+    sim.add_argument("--steps", type=int, default=1000, help="fixed steps to run")
+    sim.add_argument("--substeps", type=int, default=2, help="world steps per fixed step")
+    sim.add_argument("--solver", choices=["explicit", "xpbd"], default="explicit")
+    sim.add_argument("--no-gravity", action="store_true")
+    sim.add_argument("--no-ccd", action="store_true", help="only test where particles end each step, fast ones can tunnel")
+    sim.add_argument("--contact-iterations", type=int, default=8,
+                     help="impulse passes over each particle's contacts, 0 pushes out and stops it like before")
+    sim.add_argument("--workers", type=int, default=0, help="step spring islands in this many processes, 0 steps in-process")
+    sim.add_argument("--save", metavar="PATH", help="write final particle positions as .npy")
+    sim.add_argument("--restore", metavar="PATH", help="start from a snapshot of the same scene")
+    sim.add_argument("--snapshot", metavar="PATH", help="write the final state as a .npz snapshot")
+    sim.add_argument("--record", metavar="PATH", help="stream every fixed step to a recording for offline playback")
+    sim.add_argument("--profile", metavar="PATH", help="time every stage per fixed step, export as .csv or .json")
+    sim.set_defaults(func=cmd_simulate)
+
+    rep = commands.add_parser("replay", help="read a frame out of a recording without re-simulating")
+    rep.add_argument("recording")
+    rep.add_argument("--frame", type=int, default=-1, help="frame index, negative counts from the end")
+    rep.add_argument("--save", metavar="PATH", help="render the frame to an image")
+    rep.add_argument("--size", type=int, nargs=2, default=(1280, 720), metavar=("W", "H"))
+    rep.set_defaults(func=cmd_replay)
+
+    srv = commands.add_parser("serve", help="step a scene on a fixed tick and stream it to viewers over TCP")
+    srv.add_argument("--scene", choices=sorted(SCENES), default="jelly_quad")
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--tick-rate", type=float, default=60)
+    srv.add_argument("--ticks", type=int, help="stop after this many ticks, default runs until interrupted")
+    srv.add_argument("--substeps", type=int, default=2, help="world steps per fixed step")
+    srv.add_argument("--solver", choices=["explicit", "xpbd"], default="explicit")
+    srv.add_argument("--workers", type=int, default=0, help="step spring islands in this many processes")
+    srv.set_defaults(func=cmd_serve)
+
+    wat = commands.add_parser("watch", help="headless viewer: receive ticks from a server and report the stream")
+    wat.add_argument("--host", default="127.0.0.1")
+    wat.add_argument("--port", type=int, default=8765)
+    wat.add_argument("--ticks", type=int, default=300)
+    wat.add_argument("--move", type=float, nargs=2, metavar=("X", "Y"), help="steer the platform while watching")
+    wat.set_defaults(func=cmd_watch)
+
+    ben = commands.add_parser("bench", help="benchmark the solver, broad phase, narrow phase and builders")
+    ben.add_argument("--quick", action="store_true", help="smaller sizes, for a fast sanity run")
+    ben.add_argument("--json", metavar="PATH", help="save results as JSON")
+    ben.add_argument("--compare", metavar="PATH", help="print ratios against a previously saved JSON")
+    ben.set_defaults(func=cmd_bench)
+
+    par = commands.add_parser("parity", help="check the accelerated kernels against the code they replace")
+    par.add_argument("--cases", type=int, default=50, help="random inputs per kernel")
+    par.add_argument("--seed", type=int, default=0)
+    par.set_defaults(func=cmd_parity)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
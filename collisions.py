@@ -1,17 +1,231 @@
-from pygame_template import *
-
-class Circle(Sprite):
-    def __init__(self, radius=50, pos=V2(APP.HW,APP.HH), *groups):
+import math
+from typing import NamedTuple, Sequence
+
+import numpy as np
+import pygame
+
+from pygame_template import APP, Color, Group, Sprite, V2
+from broadphase import SpatialHash
+from kernels import JIT, circle_rect, closest_on_edges, contains
+
+
+# ===== SAT helpers =====
+
+def edge_normals(edges: np.ndarray) -> np.ndarray:
+    edges = edges[np.any(edges != 0, axis=1)]
+    normals = np.stack([-edges[:, 1], edges[:, 0]], axis=1)
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    # n and -n project to the same overlap, keep one of each
+    flip = (normals[:, 0] < 0) | ((normals[:, 0] == 0) & (normals[:, 1] < 0))
+    normals[flip] *= -1
+    return np.unique(normals.round(12), axis=0)
+
+def outward_normals(vertices: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    # one unit normal per edge, pointing away from the centroid; the vertex winding does not matter
+    normals = np.stack([-edges[:, 1], edges[:, 0]], axis=1)
+    normals /= np.maximum(np.linalg.norm(normals, axis=1), 1e-12)[:, None]
+    inward = ((vertices - vertices.mean(axis=0)) * normals).sum(axis=1) < 0
+    normals[inward] *= -1
+    return normals
+
+def sat_depth(verts_a: np.ndarray, verts_b: np.ndarray, axes: np.ndarray) -> tuple[float, tuple[float, float]]:
+    # how far a must travel along each axis to leave b, either way, so a shape fully inside the
+    # other still gets pushed all the way out; a negative depth means separated along the returned axis
+    proj_a = verts_a @ axes.T
+    proj_b = verts_b @ axes.T
+    forward = proj_b.max(axis=0) - proj_a.min(axis=0)
+    backward = proj_a.max(axis=0) - proj_b.min(axis=0)
+    depth = np.minimum(forward, backward)
+    i = int(depth.argmin())
+    axis = tuple(axes[i].tolist())
+    if depth[i] < 0 or forward[i] <= backward[i]: return float(depth[i]), axis
+    return float(depth[i]), (-axis[0], -axis[1])
+
+# vertex / axis count up to which plain floats beat numpy's per-call overhead
+SMALL_OUTLINE = 8
+
+def closest_point_on_edges(point, vertices: np.ndarray, edges: np.ndarray, inv_edge_len_sq: np.ndarray):
+    if JIT:
+        distance, x, y = closest_on_edges(point[0], point[1], vertices, edges, inv_edge_len_sq)
+        return distance, V2(x, y)
+    point = np.array((point[0], point[1]))
+    t = ((point - vertices) * edges).sum(axis=1) * inv_edge_len_sq
+    t = np.minimum(np.maximum(t, 0), 1)
+    closest = vertices + edges * t[:, None]
+    dist_sq = ((closest - point) ** 2).sum(axis=1)
+    i = dist_sq.argmin()
+    return math.sqrt(dist_sq[i]), V2(*closest[i])
+
+def closest_point_on_points(point, points: list, edge_rows: list):
+    # closest_point_on_edges over python floats, for small outlines without the JIT
+    x, y = point
+    best, bx, by = math.inf, 0.0, 0.0
+    for (vx, vy), (ex, ey, inv, _) in zip(points, edge_rows):
+        t = ((x - vx) * ex + (y - vy) * ey) * inv
+        t = 0.0 if t < 0 else 1.0 if t > 1 else t
+        cx, cy = vx + ex * t, vy + ey * t
+        d = (cx - x) ** 2 + (cy - y) ** 2
+        if d < best: best, bx, by = d, cx, cy
+    return math.sqrt(best), V2(bx, by)
+
+
+# ===== Convex decomposition =====
+# Concave outlines are ear clipped into triangles, then neighbouring pieces are merged back
+# together while the union stays convex (Hertel-Mehlhorn), which keeps the part count low.
+
+def signed_area(vertices: np.ndarray) -> float:
+    x, y = vertices[:, 0], vertices[:, 1]
+    return 0.5 * float((x * np.roll(y, -1) - np.roll(x, -1) * y).sum())
+
+def turns(vertices: np.ndarray) -> np.ndarray:
+    # cross product at every vertex, positive where a counter-clockwise outline turns left
+    edges = np.roll(vertices, -1, axis=0) - vertices
+    prev = np.roll(edges, 1, axis=0)
+    return prev[:, 0] * edges[:, 1] - prev[:, 1] * edges[:, 0]
+
+def is_convex(vertices: np.ndarray, eps: float = 1e-9) -> bool:
+    cross = turns(vertices)
+    return bool((cross >= -eps).all() or (cross <= eps).all())
+
+def triangulate(vertices: np.ndarray) -> list[list[int]]:
+    # ear clipping, vertices counter-clockwise (positive signed area)
+    remaining = list(range(len(vertices)))
+    triangles = []
+    def cross(o, a, b): return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+    points = [tuple(p) for p in vertices.tolist()]
+    while len(remaining) > 3:
+        count = len(remaining)
+        for k in range(count):
+            i, j, l = remaining[k - 1], remaining[k], remaining[(k + 1) % count]
+            a, b, c = points[i], points[j], points[l]
+            if cross(a, b, c) <= 1e-9: continue     # reflex or flat corner, not an ear
+            if any(cross(a, b, points[p]) >= 0 and cross(b, c, points[p]) >= 0 and cross(c, a, points[p]) >= 0
+                   for p in remaining if p not in (i, j, l) and points[p] not in (a, b, c)):
+                continue
+            triangles.append([i, j, l])
+            del remaining[k]
+            break
+        else:
+            # only degenerate corners left, e.g. collinear runs: clip one anyway
+            triangles.append([remaining[-1], remaining[0], remaining[1]])
+            del remaining[0]
+    triangles.append(remaining)
+    return triangles
+
+def merge_parts(p: list[int], q: list[int]) -> list[int] | None:
+    # joins two index loops across an edge a->b of p that q walks as b->a
+    for k in range(len(p)):
+        a, b = p[k], p[(k + 1) % len(p)]
+        for m in range(len(q)):
+            if q[m] == b and q[(m + 1) % len(q)] == a:
+                p_from_b = p[k + 1:] + p[:k + 1]    # b ... a
+                q_from_a = q[m + 1:] + q[:m + 1]    # a ... b
+                return p_from_b + q_from_a[1:-1]
+    return None
+
+def convex_decompose(vertices) -> list[np.ndarray]:
+    vertices = np.asarray(vertices, dtype=float)
+    if is_convex(vertices): return [vertices]
+    if signed_area(vertices) < 0: vertices = vertices[::-1]
+    parts = triangulate(vertices)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(parts)):
+            for j in range(i + 1, len(parts)):
+                joined = merge_parts(parts[i], parts[j])
+                if joined and (turns(vertices[joined]) >= -1e-9).all():
+                    parts[i] = joined
+                    del parts[j]
+                    merged = True
+                    break
+            if merged: break
+    return [vertices[part] for part in parts]
+
+
+class ConvexPart:
+    # one convex piece in its shape's local frame (relative to rect.topleft), with the world
+    # vertices cached per offset the same way Rect/Polygon cache theirs
+    __slots__ = ("local_vertices", "axes", "axis_list", "face_normals", "local_bounds", "kind", "_offset", "_world", "_points", "_bounds")
+
+    def __init__(self, vertices: np.ndarray):
+        self.local_vertices = vertices
+        edges = np.roll(vertices, -1, axis=0) - vertices
+        self.axes = edge_normals(edges)
+        self.axis_list = [tuple(axis) for axis in self.axes.tolist()]
+        self.face_normals = outward_normals(vertices, edges)
+        self.local_bounds = (*vertices.min(axis=0).tolist(), *vertices.max(axis=0).tolist())
+        axis_aligned = len(vertices) == 4 and len(self.axes) == 2 and (np.abs(self.axes) < 1e-12).any(axis=1).all()
+        self.kind = "box" if axis_aligned else "convex"
+        self._offset = None
+
+    def place(self, offset):
+        if offset == self._offset: return
+        self._offset = offset
+        ox, oy = offset
+        self._world = self.local_vertices + offset
+        self._points = [(x + ox, y + oy) for x, y in self.local_vertices.tolist()]
+        l, t, r, b = self.local_bounds
+        self._bounds = (l + ox, t + oy, r + ox, b + oy)
+
+    def world(self, offset) -> np.ndarray:
+        self.place(offset)
+        return self._world
+
+    def points(self, offset) -> list[tuple[float, float]]:
+        self.place(offset)
+        return self._points
+
+    def bounds(self, offset) -> tuple[float, float, float, float]:
+        self.place(offset)
+        return self._bounds
+
+
+# ===== Lazy surfaces =====
+
+def screen_center() -> V2:
+    # default position, read when a shape is built rather than when this module is imported
+    return V2(APP.HW, APP.HH)
+
+def surface_rect(size, center) -> pygame.FRect:
+    # the rect a Surface of this size would give, without allocating the Surface
+    rect = pygame.FRect(0, 0, int(size[0]), int(size[1]))
+    rect.center = center
+    return rect
+
+class LazyImage:
+    _image = None
+
+    @property
+    def image(self) -> pygame.Surface:
+        # only shapes that actually get blitted pay for a surface
+        if self._image is None: self._image = self.render_image()
+        return self._image
+
+    @image.setter
+    def image(self, surface: pygame.Surface): self._image = surface
+
+
+
+
+
+class Circle(LazyImage, Sprite):
+    kind = "circle"
+
+    def __init__(self, radius=50, pos: V2 = None, *groups):
         super().__init__(*groups)
+        if pos is None: pos = screen_center()
 
-        self.image = pygame.Surface((radius*2,)*2, pygame.SRCALPHA)
-        self.rect = self.image.get_frect(center = pos)
+        self.rect = surface_rect((radius*2,)*2, pos)
         self.pos = pos
         self.radius = radius
+        self.broadphase: SpatialHash | None = None
 
-        self.image.fill((0,0,0,0))
-
-        pygame.draw.circle(self.image, Color.random(), V2(self.rect.center) - V2(self.rect.topleft), radius)
+    def render_image(self) -> pygame.Surface:
+        image = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        image.fill((0,0,0,0))
+        pygame.draw.circle(image, Color.random(), V2(self.rect.size) / 2, self.radius)
+        return image
 
     # COLLISION CHECKS
 
@@ -19,10 +233,8 @@ class Circle(Sprite):
         return self.pos.distance_to(other.pos) <= self.radius + other.radius
     
     def check_collision_rect(self, other: "Rect") -> bool:
-        x, y = self.pos.x, self.pos.y
-        x = max(min(x, other.rect.right), other.rect.left)
-        y = max(min(y, other.rect.bottom), other.rect.top)
-        return self.pos.distance_to((x,y)) < self.radius
+        r = other.rect
+        return circle_rect(self.pos.x, self.pos.y, self.radius, r.left, r.top, r.right, r.bottom)[0] > 0
     
     def check_collision_polygon(self, poly: "Polygon") -> bool:
         return poly.check_collision_circle(self)
@@ -42,46 +254,43 @@ class Circle(Sprite):
             correction = push_dir * overlap
             self.pos += correction
             self.rect.center = self.pos
+            if self.broadphase: self.broadphase.update(self)
 
     def resolve_collision_rect(self, other: "Rect"):
-        x = max(other.rect.left, min(self.pos.x, other.rect.right))
-        y = max(other.rect.top,  min(self.pos.y, other.rect.bottom))
-        closest_point = V2(x, y)
-        delta = self.pos - closest_point
-        distance = delta.length()
-        if distance == 0:
-            delta = V2(1, 0)
-            distance = 1
-        overlap = self.radius - distance
+        r = other.rect
+        x, y = self.pos
+        overlap, nx, ny, _, _ = circle_rect(x, y, self.radius, r.left, r.top, r.right, r.bottom)
+        if r.left <= x <= r.right and r.top <= y <= r.bottom:
+            overlap, nx, ny = self.radius - 1, 1.0, 0.0     # center inside: pushed right, as it always was
         if overlap > 0:
-            correction = delta.normalize() * overlap
-            self.pos += correction
+            self.pos += V2(nx, ny) * overlap
             self.rect.center = self.pos
+            if self.broadphase: self.broadphase.update(self)
 
     def resolve_collision_polygon(self, poly: "Polygon"):
-        global_points = [p + poly.rect.topleft for p in poly.local_points]
-        closest_point = None
-        min_dist = float("inf")
-        for i in range(len(global_points)):
-            a = global_points[i]
-            b = global_points[(i + 1) % len(global_points)]
-            ab = b - a
-            ap = self.pos - a
-            t = max(0, min(1, ap.dot(ab) / ab.length_squared()))
-            p = a + ab * t
-            dist = self.pos.distance_to(p)
-            if dist < min_dist:
-                min_dist = dist
-                closest_point = p
+        min_dist, closest_point = poly.closest_point(self.pos)
         if min_dist < self.radius:
             correction_dir = (self.pos - closest_point).normalize()
             correction = correction_dir * (self.radius - min_dist)
             self.pos += correction
             self.rect.center = self.pos
+            if self.broadphase: self.broadphase.update(self)
+
+    # CONTINUOUS COLLISION
+
+    def sweep_and_resolve(self, start: V2, collidables: Group | SpatialHash | list) -> "TimeOfImpact | None":
+        # stops a move from start to the current position at the first surface it crosses,
+        # for moves long enough to skip over a thin shape between two discrete checks; returns that hit
+        hit = sweep_to_first_hit(self, start, collidables)
+        if hit is None: return None
+        self.rect.center = self.pos
+        if self.broadphase: self.broadphase.update(self)
+        return hit
 
     def move(self, direction: V2, dt: float):
         self.pos += direction * dt * 5
         self.rect.center = self.pos
+        if self.broadphase: self.broadphase.update(self)
 
     
         
@@ -93,16 +302,32 @@ class Circle(Sprite):
 
 
 
-class Rect(Sprite):
-    def __init__(self, pos=V2(APP.HW,APP.HH), size=V2(100,100), *groups):
+class Rect(LazyImage, Sprite):
+    kind = "rect"
+
+    def __init__(self, pos: V2 = None, size: V2 = None, *groups):
         super().__init__(*groups)
+        if pos is None: pos = screen_center()
+        if size is None: size = V2(100, 100)
 
         self.size = size
         self.pos = pos
-        self.image = pygame.Surface(size, pygame.SRCALPHA)
-        self.rect = self.image.get_frect(center = pos)
-        self.image.fill(Color.random())
+        self.rect = surface_rect(size, pos)
         self.prev_rect = self.rect.copy()
+        self.broadphase: SpatialHash | None = None
+        self._parts = None
+
+    def render_image(self) -> pygame.Surface:
+        image = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        image.fill(Color.random())
+        return image
+
+    @property
+    def parts(self) -> list[ConvexPart]:
+        w, h = self.rect.size
+        if self._parts is None or self._parts[0].local_bounds[2:] != (w, h):
+            self._parts = [ConvexPart(np.array([(0, 0), (w, 0), (w, h), (0, h)], dtype=float))]
+        return self._parts
 
     # COLLISION CHECK
 
@@ -128,6 +353,7 @@ class Rect(Sprite):
         if a.bottom > c.top and b.bottom <= c.top: a.bottom = c.top
         elif a.top < c.bottom and b.top >= c.bottom: a.top = c.bottom
         self.pos = V2(a.center)
+        if self.broadphase: self.broadphase.update(self)
 
     def resolve_collision_circle(self, circle: "Circle"):
         x = max(self.rect.left, min(circle.pos.x, self.rect.right))
@@ -143,60 +369,31 @@ class Rect(Sprite):
             correction = delta.normalize() * overlap
             self.pos += correction
             self.rect.center = self.pos
+            if self.broadphase: self.broadphase.update(self)
 
     def resolve_collision_polygon(self, poly: "Polygon"):
-        poly_pts = [V2(p + poly.rect.topleft) for p in poly.local_points]
-        rect_pts = [
-            V2(self.rect.topleft),
-            V2(self.rect.topright),
-            V2(self.rect.bottomright),
-            V2(self.rect.bottomleft)
-        ]
-
-        def get_edges(pts): return [pts[(i + 1) % len(pts)] - pts[i] for i in range(len(pts))]
-        def get_normals(edges): return [V2(-e.y, e.x).normalize() for e in edges]
-        def project(pts, axis):
-            dots = [p.dot(axis) for p in pts]
-            return min(dots), max(dots)
-        def get_overlap(minA, maxA, minB, maxB): return min(maxA, maxB) - max(minA, minB)
-
-        edges = get_edges(poly_pts) + get_edges(rect_pts)
-        axes = get_normals(edges)
-        min_overlap = float("inf")
-        smallest_axis = None
-
-        for axis in axes:
-            minA, maxA = project(poly_pts, axis)
-            minB, maxB = project(rect_pts, axis)
-            if maxA < minB or maxB < minA:
-                return  # No collision
-            overlap = get_overlap(minA, maxA, minB, maxB)
-            if overlap < min_overlap:
-                min_overlap = overlap
-                smallest_axis = axis
-
-        direction = (self.pos - poly.pos).normalize()
-        if direction.dot(smallest_axis) < 0:
-            smallest_axis = -smallest_axis
-        correction = smallest_axis * min_overlap
-        self.pos += correction
-        self.rect.center = self.pos
+        # per convex part, so concave polygons push out the right way
+        contact = collide_sat(self, poly)
+        if contact: separate(self, contact)
 
 
     def move(self, direction: V2, dt: float, speed: float = 10):
         self.prev_rect = self.rect.copy()
         self.pos += direction * dt * speed
         self.rect.center = self.pos
+        if self.broadphase: self.broadphase.update(self)
+
 
 
 
 
 
-from typing import Sequence
+class Polygon(LazyImage, Sprite):
+    kind = "polygon"
 
-class Polygon(Sprite):
-    def __init__(self, points: Sequence[V2], pos=V2(APP.HW,APP.HH), *groups):
+    def __init__(self, points: Sequence[V2], pos: V2 = None, *groups):
         super().__init__(*groups)
+        if pos is None: pos = screen_center()
 
         self.min_size_V2 = V2(min(*[p.x for p in points]), min(*[p.y for p in points]))
         self.max_size_V2 = V2(max(*[p.x for p in points]), max(*[p.y for p in points]))
@@ -205,75 +402,61 @@ class Polygon(Sprite):
         self.local_points = [p - self.min_size_V2 for p in points]
         self.pos = pos
 
-        self.image = pygame.Surface(self.size, pygame.SRCALPHA)
-        self.rect = self.image.get_frect(center = pos)
+        # ===== Cached geometry, translation invariant =====
+        self.local_vertices = np.array(self.local_points, dtype=float)
+        self.edges = np.roll(self.local_vertices, -1, axis=0) - self.local_vertices
+        self.inv_edge_len_sq = 1 / (self.edges ** 2).sum(axis=1)
+        self.edge_slopes = self.edges[:, 0] / (self.edges[:, 1] + 1e-10)
+        self.edge_rows = list(zip(*self.edges.T.tolist(), self.inv_edge_len_sq.tolist(), self.edge_slopes.tolist()))
+        self.parts = [ConvexPart(part) for part in convex_decompose(self.local_vertices)]
+        self._vertices_key = None
+        self._world_vertices = None
+        self._world_points = None
+
+        self.rect = surface_rect(self.size, pos)
         self.prev_rect = self.rect.copy()
-
-        self.image.fill((0,0,0,0))
-        pygame.draw.polygon(self.image, Color.random(), self.local_points)
+        self.broadphase: SpatialHash | None = None
+
+    def render_image(self) -> pygame.Surface:
+        image = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        image.fill((0,0,0,0))
+        pygame.draw.polygon(image, Color.random(), self.local_points)
+        return image
+
+    @property
+    def world_vertices(self) -> np.ndarray:
+        # rebuilt only after move / resolve shifted the rect
+        key = tuple(self.rect.topleft)
+        if key != self._vertices_key:
+            self._vertices_key = key
+            self._world_vertices = self.local_vertices + key
+            self._world_points = None
+        return self._world_vertices
+
+    @property
+    def world_points(self) -> list[tuple[float, float]]:
+        # world_vertices as python floats, for the small outline paths
+        vertices = self.world_vertices
+        if self._world_points is None: self._world_points = [tuple(v) for v in vertices.tolist()]
+        return self._world_points
+
+    def closest_point(self, point) -> tuple[float, V2]:
+        if JIT or len(self.edge_rows) > SMALL_OUTLINE:
+            return closest_point_on_edges(point, self.world_vertices, self.edges, self.inv_edge_len_sq)
+        return closest_point_on_points(point, self.world_points, self.edge_rows)
 
     # COLLISION CHECK
 
     def check_collision_polygon(self, other: "Polygon") -> bool:
-        def get_edges(pts): return [pts[(i + 1) % len(pts)] - pts[i] for i in range(len(pts))]
-        def get_normals(edges): return [V2(-e.y, e.x).normalize() for e in edges]
-        def project(pts, axis):
-            dots = [p.dot(axis) for p in pts]
-            return min(dots), max(dots)
-        def overlap(minA, maxA, minB, maxB): return maxA >= minB and maxB >= minA
-
-        pointsA = [p + self.rect.topleft for p in self.local_points]
-        pointsB = [p + other.rect.topleft for p in other.local_points]
-        edges = get_edges(pointsA) + get_edges(pointsB)
-        axes = get_normals(edges)
-
-        for axis in axes:
-            minA, maxA = project(pointsA, axis)
-            minB, maxB = project(pointsB, axis)
-            if not overlap(minA, maxA, minB, maxB):
-                return False
-        return True
-
+        return collide_sat(self, other) is not None
 
     def check_collision_rect(self, rect: "Rect") -> bool:
-        def get_edges(pts): return [pts[(i + 1) % len(pts)] - pts[i] for i in range(len(pts))]
-        def get_normals(edges): return [V2(-e.y, e.x).normalize() for e in edges]
-        def project(pts, axis):
-            dots = [p.dot(axis) for p in pts]
-            return min(dots), max(dots)
-        def overlap(minA, maxA, minB, maxB): return maxA >= minB and maxB >= minA
-
-        # Convert all points to Vector2
-        poly_pts = [V2(p + self.rect.topleft) for p in self.local_points]
-        rect_pts = [
-            V2(rect.rect.topleft),
-            V2(rect.rect.topright),
-            V2(rect.rect.bottomright),
-            V2(rect.rect.bottomleft)
-        ]
-        edges = get_edges(poly_pts) + get_edges(rect_pts)
-        axes = get_normals(edges)
-
-        for axis in axes:
-            minA, maxA = project(poly_pts, axis)
-            minB, maxB = project(rect_pts, axis)
-            if not overlap(minA, maxA, minB, maxB):
-                return False
-        return True
-
+        return collide_sat(self, rect) is not None
 
     def check_collision_circle(self, circle: "Circle") -> bool:
-        global_points = [p + self.rect.topleft for p in self.local_points]
-        for i in range(len(global_points)):
-            a = global_points[i]
-            b = global_points[(i + 1) % len(global_points)]
-            ab = b - a
-            ap = circle.pos - a
-            t = max(0, min(1, ap.dot(ab) / ab.length_squared()))
-            closest = a + ab * t
-            dist = circle.pos.distance_to(closest)
-            if dist < circle.radius: return True
-        if self.point_in_polygon(circle.pos, global_points): return True
+        dist, _ = self.closest_point(circle.pos)
+        if dist < circle.radius: return True
+        if self.contains_point(circle.pos): return True
         return False
 
     @staticmethod
@@ -291,85 +474,275 @@ class Polygon(Sprite):
                     inside = not inside
         return inside
 
+    def contains_point(self, point) -> bool:
+        # point_in_polygon over the cached arrays, one ray cast against every edge at once
+        x, y = point
+        if JIT: return contains(x, y, self.world_vertices, self.edges, self.edge_slopes)
+        if len(self.edge_rows) <= SMALL_OUTLINE:
+            inside = False
+            for (xi, yi), (_, ey, _, slope) in zip(self.world_points, self.edge_rows):
+                if (yi > y) != (yi + ey > y) and x < xi + (y - yi) * slope: inside = not inside
+            return inside
+        vertices = self.world_vertices
+        yi = vertices[:, 1]
+        crosses = (yi > y) != (yi + self.edges[:, 1] > y)
+        intersect_x = vertices[:, 0] + (y - yi) * self.edge_slopes
+        return bool(np.count_nonzero(crosses & (x < intersect_x)) & 1)
+
     # COLLISION RESOLUTION
 
     def resolve_collision_polygon(self, other: "Polygon"):
-        get_edges = lambda pts: [pts[(i + 1) % len(pts)] - pts[i] for i in range(len(pts))]
-        get_normals = lambda edges: [V2(-e.y, e.x).normalize() for e in edges]
-        def project(pts, axis):
-            dots = [p.dot(axis) for p in pts]
-            return min(dots), max(dots)
-        def get_overlap(minA, maxA, minB, maxB): return min(maxA, maxB) - max(minA, minB)
-        pointsA = [p + self.rect.topleft for p in self.local_points]
-        pointsB = [p + other.rect.topleft for p in other.local_points]
-        edges = get_edges(pointsA) + get_edges(pointsB)
-        axes = get_normals(edges)
-        min_overlap = float("inf")
-        smallest_axis = None
-        for axis in axes:
-            minA, maxA = project(pointsA, axis)
-            minB, maxB = project(pointsB, axis)
-            if maxA < minB or maxB < minA: return
-            overlap = get_overlap(minA, maxA, minB, maxB)
-            if overlap < min_overlap:
-                min_overlap = overlap
-                smallest_axis = axis
-        direction = (self.pos - other.pos).normalize()
-        if direction.dot(smallest_axis) < 0: smallest_axis = -smallest_axis
-        correction = smallest_axis * min_overlap
-        self.pos += correction
-        self.rect.center = self.pos
+        contact = collide_sat(self, other)
+        if contact: separate(self, contact)
 
     def resolve_collision_circle(self, circle: "Circle"):
-        global_points = [p + self.rect.topleft for p in self.local_points]
-        closest_point = None
-        min_dist = float("inf")
-        for i in range(len(global_points)):
-            a = global_points[i]
-            b = global_points[(i + 1) % len(global_points)]
-            ab = b - a
-            ap = circle.pos - a
-            t = max(0, min(1, ap.dot(ab) / ab.length_squared()))
-            p = a + ab * t
-            dist = circle.pos.distance_to(p)
-            if dist < min_dist:
-                min_dist = dist
-                closest_point = p
+        min_dist, closest_point = self.closest_point(circle.pos)
         if min_dist < circle.radius:
             correction_dir = (circle.pos - closest_point).normalize()
             correction = correction_dir * (circle.radius - min_dist)
             self.pos -= correction
             self.rect.center = self.pos
+            if self.broadphase: self.broadphase.update(self)
 
     def resolve_collision_rect(self, rect: "Rect"):
-        poly_pts = [V2(p + self.rect.topleft) for p in self.local_points]
-        rect_pts = [V2(rect.rect.topleft),V2(rect.rect.topright),V2(rect.rect.bottomright),V2(rect.rect.bottomleft)]
-        def get_edges(pts): return [pts[(i + 1) % len(pts)] - pts[i] for i in range(len(pts))]
-        def get_normals(edges): return [V2(-e.y, e.x).normalize() for e in edges]
-        def project(pts, axis):
-            dots = [p.dot(axis) for p in pts]
-            return min(dots), max(dots)
-        def get_overlap(minA, maxA, minB, maxB): return min(maxA, maxB) - max(minA, minB)
-        edges = get_edges(poly_pts) + get_edges(rect_pts)
-        axes = get_normals(edges)
-        min_overlap = float("inf")
-        smallest_axis = None
-        for axis in axes:
-            minA, maxA = project(poly_pts, axis)
-            minB, maxB = project(rect_pts, axis)
-            if maxA < minB or maxB < minA: return
-            overlap = get_overlap(minA, maxA, minB, maxB)
-            if overlap < min_overlap:
-                min_overlap = overlap
-                smallest_axis = axis
-        direction = (self.pos - rect.pos).normalize()
-        if direction.dot(smallest_axis) < 0: smallest_axis = -smallest_axis
-        correction = smallest_axis * min_overlap
-        self.pos += correction
-        self.rect.center = self.pos
+        contact = collide_sat(self, rect)
+        if contact: separate(self, contact)
 
 
     def move(self, direction: V2, dt: float):
         self.prev_rect = self.rect.copy()
         self.pos += direction * dt * 5
         self.rect.center = self.pos
+        if self.broadphase: self.broadphase.update(self)
+
+
+
+
+
+
+class Contact(NamedTuple):
+    normal: V2      # unit vector pushing a out of b
+    depth: float    # how far a has to move along normal
+    point: V2       # contact point on the surface of b
+
+
+def aabb(shape) -> tuple[float, float, float, float]:
+    if shape.kind == "circle":
+        x, y = shape.pos
+        r = shape.radius
+        return x - r, y - r, x + r, y + r
+    r = shape.rect
+    if shape.kind == "polygon":
+        # the surface, and so the rect, is truncated to whole pixels, the vertices are not
+        w, h = shape.size
+        return r.left, r.top, r.left + w, r.top + h
+    return r.left, r.top, r.right, r.bottom
+
+def collide(a, b) -> Contact | None:
+    al, at, ar, ab = aabb(a)
+    bl, bt, br, bb = aabb(b)
+    if ar < bl or br < al or ab < bt or bb < at: return None     # cheap reject before any narrow phase
+
+    narrow = COLLIDERS.get((a.kind, b.kind))
+    if narrow: return narrow(a, b)
+    contact = COLLIDERS[(b.kind, a.kind)](b, a)
+    if contact is None: return None
+    return Contact(-contact.normal, contact.depth, contact.point - contact.normal * contact.depth)
+
+def separate(shape, contact: Contact):
+    shape.pos += contact.normal * contact.depth
+    shape.rect.center = shape.pos
+    if shape.broadphase: shape.broadphase.update(shape)
+
+# ===== Narrow phase =====
+
+def collide_circle_circle(a: Circle, b: Circle) -> Contact | None:
+    delta = a.pos - b.pos
+    distance = delta.length()
+    depth = a.radius + b.radius - distance
+    if depth <= 0: return None
+    normal = delta / distance if distance else V2(1, 0)
+    return Contact(normal, depth, b.pos + normal * b.radius)
+
+def collide_circle_rect(a: Circle, b: Rect) -> Contact | None:
+    pos, r = a.pos, b.rect
+    depth, nx, ny, x, y = circle_rect(pos.x, pos.y, a.radius, r.left, r.top, r.right, r.bottom)
+    if depth <= 0: return None
+    return Contact(V2(nx, ny), depth, V2(x, y))
+
+def collide_circle_polygon(a: Circle, b: Polygon) -> Contact | None:
+    distance, closest = b.closest_point(a.pos)
+    if b.contains_point(a.pos):
+        normal = (closest - a.pos) / distance if distance else V2(1, 0)
+        return Contact(normal, a.radius + distance, closest)
+    if distance >= a.radius: return None
+    return Contact((a.pos - closest) / distance, a.radius - distance, closest)
+
+def collide_rect_rect(a: Rect, b: Rect) -> Contact | None:
+    ra, rb = a.rect, b.rect
+    pushes = [
+        (rb.right - ra.left, V2(1, 0), V2(rb.right, ra.centery)),
+        (ra.right - rb.left, V2(-1, 0), V2(rb.left, ra.centery)),
+        (rb.bottom - ra.top, V2(0, 1), V2(ra.centerx, rb.bottom)),
+        (ra.bottom - rb.top, V2(0, -1), V2(ra.centerx, rb.top)),
+    ]
+    depth, normal, point = min(pushes, key=lambda push: push[0])
+    if depth <= 0: return None
+    return Contact(normal, depth, point)
+
+def collide_sat(a: Rect | Polygon, b: Rect | Polygon) -> Contact | None:
+    # convex part against convex part, each pair behind its own AABB test; the deepest overlap wins
+    oa, ob = tuple(a.rect.topleft), tuple(b.rect.topleft)
+    best = None
+    for pa in a.parts:
+        la, ta, ra, ba = pa.bounds(oa)
+        for pb in b.parts:
+            lb, tb, rb, bb = pb.bounds(ob)
+            if ra < lb or rb < la or ba < tb or bb < ta: continue
+            hit = collide_parts(pa, oa, pb, ob)
+            if hit and (best is None or hit[0] > best[0]): best = (*hit, pa)
+    if best is None: return None
+    depth, (nx, ny), pa = best
+    deepest = min(pa.points(oa), key=lambda p: p[0] * nx + p[1] * ny)      # vertex of a furthest inside b
+    normal = V2(nx, ny)
+    return Contact(normal, depth, V2(deepest) + normal * depth)
+
+# last axis that separated a pair of parts, tried first next time; ids only serve as a hint
+SEPARATING_AXES: dict[tuple[int, int], tuple[float, float]] = {}
+
+def separated_on(axis, points_a, points_b) -> bool:
+    ax, ay = axis
+    proj_a = [x * ax + y * ay for x, y in points_a]
+    proj_b = [x * ax + y * ay for x, y in points_b]
+    return max(proj_a) < min(proj_b) or max(proj_b) < min(proj_a)
+
+def box_depth(bounds_a, bounds_b) -> tuple[float, tuple[float, float]]:
+    la, ta, ra, ba = bounds_a
+    lb, tb, rb, bb = bounds_b
+    return min((rb - la, (1.0, 0.0)), (ra - lb, (-1.0, 0.0)), (bb - ta, (0.0, 1.0)), (ba - tb, (0.0, -1.0)))
+
+def collide_parts(pa: ConvexPart, oa, pb: ConvexPart, ob) -> tuple[float, tuple[float, float]] | None:
+    # (depth, normal pushing a out of b)
+    if pa.kind == "box" and pb.kind == "box":
+        hit = box_depth(pa.bounds(oa), pb.bounds(ob))
+        return hit if hit[0] > 0 else None
+
+    key = (id(pa), id(pb))
+    axis = SEPARATING_AXES.get(key)
+    if axis and separated_on(axis, pa.points(oa), pb.points(ob)): return None
+
+    if pa.kind == "box" or pb.kind == "box":
+        # a box's axes are x and y, where every part projects onto its own AABB: no need to project
+        seed = box_depth(pa.bounds(oa), pb.bounds(ob))
+        axes = pb.axis_list if pa.kind == "box" else pa.axis_list
+    else:
+        seed = (math.inf, None)
+        axes = pa.axis_list + pb.axis_list
+
+    if len(axes) <= SMALL_OUTLINE:
+        # a handful of axes: plain floats beat numpy's per-call overhead, whatever the part's kind
+        depth, normal = sat_push_points(pa.points(oa), pb.points(ob), axes, seed)
+    else:
+        depth, normal = sat_depth(pa.world(oa), pb.world(ob), np.concatenate((pa.axes, pb.axes)))
+    if depth < 0:
+        if len(SEPARATING_AXES) > 50000: SEPARATING_AXES.clear()
+        SEPARATING_AXES[key] = normal
+        return None
+    return depth, normal
+
+def sat_push_points(points_a, points_b, axes, seed=(math.inf, None)) -> tuple[float, tuple[float, float]]:
+    # sat_depth over python floats, starting from an already known (depth, normal)
+    best_depth, best_normal = seed
+    for ax, ay in axes:
+        proj_a = [x * ax + y * ay for x, y in points_a]
+        proj_b = [x * ax + y * ay for x, y in points_b]
+        forward = max(proj_b) - min(proj_a)
+        backward = max(proj_a) - min(proj_b)
+        if forward < 0 or backward < 0: return min(forward, backward), (ax, ay)
+        if forward <= backward:
+            if forward < best_depth: best_depth, best_normal = forward, (ax, ay)
+        elif backward < best_depth: best_depth, best_normal = backward, (-ax, -ay)
+    return best_depth, best_normal
+
+COLLIDERS = {
+    ("circle", "circle"): collide_circle_circle,
+    ("circle", "rect"): collide_circle_rect,
+    ("circle", "polygon"): collide_circle_polygon,
+    ("rect", "rect"): collide_rect_rect,
+    ("rect", "polygon"): collide_sat,
+    ("polygon", "rect"): collide_sat,
+    ("polygon", "polygon"): collide_sat,
+}
+
+
+# ===== Continuous collision =====
+# Swept circle against convex shapes: the circle's path is a ray against the shape grown by
+# the radius, i.e. every face pushed out along its normal plus a circle around every vertex.
+
+CCD_SKIN = 0.01     # left between the circle and the surface it was stopped at
+
+class TimeOfImpact(NamedTuple):
+    time: float     # fraction of the move, 0 at the start, 1 at the end
+    normal: V2      # surface normal at the impact, pointing back at the circle
+
+def sweep_circle_convex(start, delta, radius: float, vertices: np.ndarray, normals: np.ndarray) -> TimeOfImpact | None:
+    s = np.array((start[0], start[1]))
+    d = np.array((delta[0], delta[1]))
+    best_time, best_normal = np.inf, None
+
+    # faces: only ones the circle starts in front of and moves towards
+    gap = ((s - vertices) * normals).sum(axis=1) - radius
+    approach = normals @ d
+    hits = (gap >= 0) & (approach < 0)
+    if hits.any():
+        time = gap / np.where(hits, -approach, 1)
+        edges = np.roll(vertices, -1, axis=0) - vertices
+        touch = s + d * time[:, None] - normals * radius - vertices
+        along = (touch * edges).sum(axis=1) / (edges * edges).sum(axis=1)
+        time[~hits | (time > 1) | (along < 0) | (along > 1)] = np.inf
+        i = time.argmin()
+        if time[i] < best_time: best_time, best_normal = time[i], V2(*normals[i])
+
+    # vertices: the ray against a circle of the same radius around each corner
+    offset = s - vertices
+    a = d @ d
+    if a > 0:
+        b = offset @ d
+        c = (offset * offset).sum(axis=1) - radius * radius
+        disc = b * b - a * c
+        ok = (c >= 0) & (b < 0) & (disc >= 0)
+        if ok.any():
+            time = np.where(ok, (-b - np.sqrt(np.maximum(disc, 0))) / a, np.inf)
+            time[time > 1] = np.inf
+            i = time.argmin()
+            if time[i] < best_time:
+                best_time, best_normal = time[i], V2(*((offset[i] + d * time[i]) / radius))
+
+    if best_normal is None: return None
+    return TimeOfImpact(float(best_time), best_normal)
+
+def sweep(circle: Circle, shape, start: V2, end: V2) -> TimeOfImpact | None:
+    if shape.kind not in SWEEPABLE: return None
+    offset = tuple(shape.rect.topleft)
+    first = None
+    for part in shape.parts:
+        hit = sweep_circle_convex(start, end - start, circle.radius, part.world(offset), part.face_normals)
+        if hit and (first is None or hit.time < first.time): first = hit
+    return first
+
+SWEEPABLE = ("rect", "polygon")
+
+def sweep_to_first_hit(circle, start: V2, collidables: Group | SpatialHash | list) -> TimeOfImpact | None:
+    # stops the circle's move from start to its current position at the first surface it crosses
+    end = circle.pos
+    if isinstance(collidables, SpatialHash):
+        r = circle.radius
+        collidables = collidables.query_box(min(start.x, end.x) - r, min(start.y, end.y) - r,
+                                            max(start.x, end.x) + r, max(start.y, end.y) + r)
+    first = None
+    for shape in collidables:
+        hit = sweep(circle, shape, start, end)
+        if hit and (first is None or hit.time < first.time): first = hit
+    if first is None: return None
+    circle.pos = start + (end - start) * first.time + first.normal * CCD_SKIN
+    return first
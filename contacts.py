@@ -0,0 +1,127 @@
+from collisions import collide
+from world import SoftBodyWorld
+
+
+# ===== Contact solver =====
+# Particles against the static collidables, resolved together instead of one shape at a time.
+# Every contact of a step is collected first, then a particle's contacts are iterated as
+# sequential impulses: accumulated normal impulses never pull (clamped at 0), friction is
+# clamped to friction * normal impulse. Particles have unit mass, so an impulse is a velocity change.
+# The accumulated impulses are kept per (particle, collidable) and applied up front next step,
+# so a body resting on the floor starts where the last step converged and needs a single pass.
+# Given the positions at the start of the step, a contact whose friction held inside its cone
+# also takes back the step's slide along it, the part of gravity's move the impulses never see.
+
+class ContactSolver:
+    def __init__(self, world: SoftBodyWorld, iterations: int = 8, restitution: float = 0.1, friction: float = 0.6):
+        self.world = world
+        self.iterations = iterations
+        self.restitution = restitution
+        self.friction = friction
+        self.bounce_threshold = 0.5     # slower new contacts don't bounce
+        self.tolerance = 1e-4           # impulse change below which a particle's contacts count as solved
+        self.warm_start = True
+        self.same_contact = 0.9         # cos of the largest normal change that still reuses a cached impulse
+
+        self.cache: dict[tuple[int, object], tuple[float, float, float, float]] = {}   # normal x, y, normal and friction impulse
+        self.dt = None
+        self.contacts = 0               # last step, for the profiler
+        self.iterations_used = 0
+        self.warm_started = 0
+
+    def clear(self):
+        self.cache = {}
+
+    def solve(self, candidates, dt: float, start=None) -> int:
+        # candidates: (particle, shapes near it) pairs, start: positions before the step; returns the number of contacts
+        world = self.world
+        previous, cache = self.cache, {}
+        scale = dt / self.dt if self.dt else 1.0    # impulses grow with the step they were accumulated over
+        self.dt = dt
+        self.contacts = self.iterations_used = self.warm_started = 0
+
+        if start is not None and len(start) != world.particle_count: start = None
+        for particle, shapes in candidates:
+            contacts = []
+            for shape in shapes:
+                contact = collide(particle, shape)
+                if contact: contacts.append((shape, contact))
+            if contacts: self.solve_particle(particle.index, contacts, previous, cache, scale,
+                                             None if start is None else start[particle.index])
+
+        # sleeping particles weren't tested, keep their impulses for when they wake
+        asleep = world.asleep
+        for key, value in previous.items():
+            if key not in cache and key[0] < world.particle_count and asleep[key[0]]: cache[key] = value
+        self.cache = cache
+        return self.contacts
+
+    def solve_particle(self, i: int, contacts, previous: dict, cache: dict, scale: float, start=None):
+        world = self.world
+        x, y = world.pos[i].tolist()
+        vx, vy = world.velocity[i].tolist()
+
+        rows = []   # [shape, nx, ny, plane, bias, normal impulse, friction impulse]
+        for shape, contact in contacts:
+            nx, ny = contact.normal
+            # the particle has to end up at least depth further along the normal than it is now
+            rows.append([shape, nx, ny, x * nx + y * ny + contact.depth, 0.0, 0.0, 0.0])
+
+        for row in rows:
+            cached = previous.get((i, row[0]))
+            if cached is not None and cached[0] * row[1] + cached[1] * row[2] >= self.same_contact:
+                # a contact held since the last step is resting, only new ones bounce
+                if not self.warm_start: continue
+                row[5], row[6] = cached[2] * scale, cached[3] * scale
+                vx += row[1] * row[5] - row[2] * row[6]
+                vy += row[2] * row[5] + row[1] * row[6]
+                self.warm_started += 1
+            else:
+                approach = vx * row[1] + vy * row[2]
+                if approach < -self.bounce_threshold: row[4] = -self.restitution * approach
+
+        friction = self.friction
+        iterations = 0
+        # a lone contact is exact after one pass, friction acts across the normal
+        for _ in range(max(1, self.iterations) if len(rows) > 1 else 1):
+            iterations += 1
+            change = 0.0
+            for row in rows:
+                _, nx, ny, plane, bias, impulse, tangent = row
+                # push out of the contact plane, every contact sees the others' corrections
+                penetration = plane - (x * nx + y * ny)
+                if penetration > 0:
+                    x += nx * penetration
+                    y += ny * penetration
+                    if iterations > 1: change = max(change, penetration)    # the first pass always has some
+
+                new = max(impulse + bias - (vx * nx + vy * ny), 0.0)
+                vx += nx * (new - impulse)
+                vy += ny * (new - impulse)
+                change = max(change, abs(new - impulse))
+                impulse = new
+
+                # tangent is the normal turned a quarter, (-ny, nx)
+                limit = friction * impulse
+                new = min(max(tangent - (vy * nx - vx * ny), -limit), limit)
+                vx -= ny * (new - tangent)
+                vy += nx * (new - tangent)
+                change = max(change, abs(new - tangent))
+                row[5], row[6] = impulse, new
+            if change < self.tolerance: break
+
+        if start is not None:
+            sx, sy = start.tolist()
+            for _, nx, ny, _, _, impulse, tangent in rows:
+                # static friction: the particle stays where it touched, less the push out along the normal
+                if abs(tangent) < friction * impulse:
+                    slide = (y - sy) * nx - (x - sx) * ny
+                    x += ny * slide
+                    y -= nx * slide
+
+        world.pos[i] = x, y
+        world.velocity[i] = vx, vy
+        for shape, nx, ny, _, _, impulse, tangent in rows:
+            cache[(i, shape)] = (nx, ny, impulse, tangent)
+        self.contacts += len(rows)
+        self.iterations_used += iterations
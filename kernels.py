@@ -0,0 +1,158 @@
+import math
+import os
+
+import numpy as np
+
+
+# ===== Optional JIT =====
+# The innermost loops as plain scalar code. With Numba installed they are compiled on first use
+# and the machine code is cached on disk next to this file (or in NUMBA_CACHE_DIR), so later runs
+# load it instead of compiling. Without Numba, or with SPRINGS_NO_JIT=1, callers keep their NumPy
+# versions; the scalar ones still run as plain Python, which is what the parity check compares against.
+
+try:
+    if os.environ.get("SPRINGS_NO_JIT"): raise ImportError("disabled by SPRINGS_NO_JIT")
+    import numba
+except ImportError:
+    numba = None
+
+JIT = numba is not None
+
+
+def jit(fn):
+    # the plain function stays reachable as .py_func either way
+    if numba is None:
+        fn.py_func = fn
+        return fn
+    return numba.njit(cache=True)(fn)
+
+
+# ===== Springs =====
+
+@jit
+def spring_forces_loop(pos, velocity, force, a, b, k, damping, rest_len):
+    for s in range(len(a)):
+        i, j = a[s], b[s]
+        dx = pos[i, 0] - pos[j, 0]
+        dy = pos[i, 1] - pos[j, 1]
+        dist = math.hypot(dx, dy)
+        if dist == 0: continue
+        nx, ny = dx / dist, dy / dist
+        closing = (velocity[i, 0] - velocity[j, 0]) * nx + (velocity[i, 1] - velocity[j, 1]) * ny
+        magnitude = -k[s] * (dist - rest_len[s]) - damping[s] * closing
+        force[i, 0] += nx * magnitude
+        force[i, 1] += ny * magnitude
+        force[j, 0] -= nx * magnitude
+        force[j, 1] -= ny * magnitude
+
+@jit
+def integrate_loop(pos, velocity, force, fixed, dt, drag):
+    for i in range(len(pos)):
+        if not fixed[i]:
+            for axis in range(2):
+                v = (velocity[i, axis] + force[i, axis] * dt) * drag
+                velocity[i, axis] = v
+                pos[i, axis] += v * dt
+        force[i, 0] = 0.0
+        force[i, 1] = 0.0
+
+@jit
+def xpbd_constraints_loop(pos, a, b, inv_mass, rest_len, compliance, iterations):
+    # Gauss-Seidel over the springs in order, each correction lands before the next spring reads
+    lam = np.zeros(len(a))
+    for _ in range(iterations):
+        for s in range(len(a)):
+            i, j = a[s], b[s]
+            wi, wj = inv_mass[i], inv_mass[j]
+            denominator = wi + wj + compliance[s]
+            if compliance[s] == 0 or denominator == 0: continue
+            dx = pos[i, 0] - pos[j, 0]
+            dy = pos[i, 1] - pos[j, 1]
+            dist = math.hypot(dx, dy)
+            if dist == 0: continue
+            d_lam = (rest_len[s] - dist - compliance[s] * lam[s]) / denominator
+            lam[s] += d_lam
+            dx, dy = dx / dist * d_lam, dy / dist * d_lam
+            pos[i, 0] += dx * wi
+            pos[i, 1] += dy * wi
+            pos[j, 0] -= dx * wj
+            pos[j, 1] -= dy * wj
+
+@jit
+def xpbd_damping_loop(pos, velocity, a, b, inv_mass, damping, dt):
+    # the colored damping pass of xpbd_step, one spring after another
+    for s in range(len(a)):
+        i, j = a[s], b[s]
+        wi, wj = inv_mass[i], inv_mass[j]
+        if wi + wj == 0: continue
+        dx = pos[i, 0] - pos[j, 0]
+        dy = pos[i, 1] - pos[j, 1]
+        dist = math.hypot(dx, dy)
+        if dist == 0: continue
+        nx, ny = dx / dist, dy / dist
+        closing = (velocity[i, 0] - velocity[j, 0]) * nx + (velocity[i, 1] - velocity[j, 1]) * ny
+        relax = min(damping[s] * dt, 1.0) * closing / (wi + wj)
+        velocity[i, 0] -= nx * relax * wi
+        velocity[i, 1] -= ny * relax * wi
+        velocity[j, 0] += nx * relax * wj
+        velocity[j, 1] += ny * relax * wj
+
+
+# ===== Circles against shapes =====
+# Floats in, floats out: no V2 or temporary arrays per test.
+
+@jit
+def circle_rect(x, y, radius, left, top, right, bottom):
+    # (depth, normal x, normal y, point x, point y), depth <= 0 when apart; point is on the rect
+    cx = max(left, min(x, right))
+    cy = max(top, min(y, bottom))
+    dx, dy = x - cx, y - cy
+    distance = math.hypot(dx, dy)
+    if distance:
+        return radius - distance, dx / distance, dy / distance, cx, cy
+
+    # center inside the rect: leave through the nearest face
+    gap, nx, ny = x - left, -1.0, 0.0
+    if right - x < gap: gap, nx, ny = right - x, 1.0, 0.0
+    if y - top < gap: gap, nx, ny = y - top, 0.0, -1.0
+    if bottom - y < gap: gap, nx, ny = bottom - y, 0.0, 1.0
+    return radius + gap, nx, ny, x + nx * gap, y + ny * gap
+
+@jit
+def closest_on_edges(x, y, vertices, edges, inv_edge_len_sq):
+    # (distance, closest x, closest y) over every edge
+    best, bx, by = math.inf, 0.0, 0.0
+    for e in range(len(vertices)):
+        t = ((x - vertices[e, 0]) * edges[e, 0] + (y - vertices[e, 1]) * edges[e, 1]) * inv_edge_len_sq[e]
+        t = min(max(t, 0.0), 1.0)
+        cx = vertices[e, 0] + edges[e, 0] * t
+        cy = vertices[e, 1] + edges[e, 1] * t
+        d = (cx - x) ** 2 + (cy - y) ** 2
+        if d < best: best, bx, by = d, cx, cy
+    return math.sqrt(best), bx, by
+
+@jit
+def contains(x, y, vertices, edges, edge_slopes):
+    # even-odd ray cast, same test as Polygon.contains_point
+    inside = False
+    for e in range(len(vertices)):
+        yi = vertices[e, 1]
+        if (yi > y) != (yi + edges[e, 1] > y) and x < vertices[e, 0] + (y - yi) * edge_slopes[e]:
+            inside = not inside
+    return inside
+
+
+def warm_up():
+    # compile (or load from the disk cache) every kernel now rather than on the first frame
+    pos, velocity, force = np.zeros((2, 2)), np.zeros((2, 2)), np.zeros((2, 2))
+    index, values = np.array([0], dtype=np.intp), np.ones(1)
+    spring_forces_loop(pos, velocity, force, index, index + 1, values, values, values)
+    integrate_loop(pos, velocity, force, np.zeros(2, dtype=bool), 1.0, 1.0)
+    xpbd_constraints_loop(pos, index, index + 1, np.ones(2), values, values, 1)
+    xpbd_damping_loop(pos, velocity, index, index + 1, np.ones(2), values, 1.0)
+    circle_rect(0.0, 0.0, 1.0, -1.0, -1.0, 1.0, 1.0)
+    circle_rect(0.0, 0.0, 1.0, -1, -1, 1, 1)        # pygame.Rect sides are ints
+    vertices = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]])
+    edges = np.roll(vertices, -1, axis=0) - vertices
+    closest_on_edges(0.5, 0.5, vertices, edges, 1 / (edges ** 2).sum(axis=1))
+    contains(0.2, 0.2, vertices, edges, np.ones(3))
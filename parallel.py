@@ -0,0 +1,175 @@
+import multiprocessing as mp
+import os
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from kernels import JIT
+from world import SoftBodyWorld, accumulate_spring_forces, integrate, spring_colors, xpbd_step
+
+
+SHARED_FIELDS = SoftBodyWorld.PARTICLE_FIELDS + SoftBodyWorld.SPRING_FIELDS
+
+
+# ===== Worker process =====
+
+def attach(specs: dict) -> tuple[list, dict]:
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in specs.items():
+        # registers with the parent's resource tracker, which already holds the block: no-op. Unregistering
+        # here would drop the parent's entry, and the parent's unlink would then trip the tracker.
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return blocks, arrays
+
+def step_partition(arrays: dict, particles, a, b, springs, colors, dt: float, drag: float, solver: str, iterations: int):
+    pos = arrays["pos"][particles]
+    velocity = arrays["velocity"][particles]
+    force = arrays["force"][particles]
+    k, damping, rest_len = arrays["k"][springs], arrays["damping"][springs], arrays["rest_len"][springs]
+    # sleeping particles are held like fixed ones, their forces are dropped
+    held = arrays["fixed"][particles] | arrays["asleep"][particles]
+    if solver == "xpbd":
+        xpbd_step(pos, velocity, force, held, a, b, k, damping, rest_len, dt, drag, iterations, colors)
+    else:
+        if len(springs): accumulate_spring_forces(pos, velocity, force, a, b, k, damping, rest_len)
+        integrate(pos, velocity, force, held, dt, drag)
+    arrays["pos"][particles] = pos
+    arrays["velocity"][particles] = velocity
+    arrays["force"][particles] = 0
+
+def worker(conn):
+    blocks, arrays, partition = [], {}, None
+    parent = os.getppid()
+    while True:
+        # forked siblings hold copies of this pipe, so a crashed parent never shows up as EOF;
+        # an orphaned worker is re-parented instead, it exits and the tracker unlinks the blocks
+        if not conn.poll(1.0):
+            if os.getppid() != parent: break
+            continue
+        message = conn.recv()
+        if message is None: break
+        command = message[0]
+        if command == "attach":
+            arrays = {}
+            for block in blocks: block.close()
+            blocks, arrays = attach(message[1])
+        elif command == "assign":
+            # colored once per partition, the numpy xpbd path needs it every step
+            particles, a, b, springs = message[1]
+            partition = (particles, a, b, springs, None if JIT else spring_colors(len(particles), a, b))
+        elif command == "step" and partition is not None:
+            step_partition(arrays, *partition, *message[1:])
+        conn.send(True)
+    arrays = {}
+    for block in blocks: block.close()
+
+
+# ===== Main process =====
+
+class ParallelStepper:
+    def __init__(self, world: SoftBodyWorld, workers: int = None, context: str = None):
+        self.world = world
+        self.workers = workers or os.cpu_count() or 1
+
+        ctx = mp.get_context(context)
+        # started before the workers so every start method hands them this tracker, a forked worker
+        # would otherwise start its own, which unlinks the blocks when the worker exits
+        if os.name == "posix": resource_tracker.ensure_running()
+        self.connections, self.processes = [], []
+        for _ in range(self.workers):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=worker, args=(child,), daemon=True)
+            process.start()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+        self.blocks: list[shared_memory.SharedMemory] = []
+        self.arrays: dict[str, np.ndarray] = {}
+        self._topology_key = None
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def broadcast(self, messages):
+        for conn, message in zip(self.connections, messages): conn.send(message)
+        for conn in self.connections: conn.recv()
+
+    # ===== Shared state =====
+
+    def share(self):
+        # move the world's arrays into shared memory, the world keeps working on the shared views
+        old_blocks = self.blocks
+        self.blocks, self.arrays, specs = [], {}, {}
+        for name in SHARED_FIELDS:
+            array = getattr(self.world, name)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            view[:] = array
+            setattr(self.world, name, view)
+            self.blocks.append(block)
+            self.arrays[name] = view
+            specs[name] = (block.name, array.shape, array.dtype.str)
+        self.broadcast([("attach", specs)] * self.workers)
+        for block in old_blocks:
+            block.close()
+            block.unlink()
+
+    def partition(self):
+        # islands never exchange spring forces, so each worker gets whole islands, largest first onto the lightest worker
+        world = self.world
+        m = world.spring_count
+        labels = world.island_labels()
+        islands = world.islands()
+        springs_per_island = np.bincount(labels[world.spring_a[:m]], minlength=len(islands))
+        cost = np.array([len(island) for island in islands]) + springs_per_island
+
+        load = np.zeros(self.workers)
+        owner = np.zeros(len(islands), dtype=np.intp)
+        for island in np.argsort(-cost, kind="stable"):
+            owner[island] = load.argmin()
+            load[owner[island]] += cost[island]
+
+        local = np.empty(world.particle_count, dtype=np.intp)
+        spring_owner = owner[labels[world.spring_a[:m]]]
+        messages = []
+        for w in range(self.workers):
+            particles = np.concatenate([islands[i] for i in np.flatnonzero(owner == w)] or [np.zeros(0, dtype=np.intp)])
+            local[particles] = np.arange(len(particles))
+            springs = np.flatnonzero(spring_owner == w)
+            messages.append(("assign", (particles, local[world.spring_a[springs]], local[world.spring_b[springs]], springs)))
+        self.broadcast(messages)
+        self._topology_key = (world.particle_count, world.spring_count)
+
+    def sync(self):
+        world = self.world
+        if any(getattr(world, name) is not self.arrays.get(name) for name in SHARED_FIELDS): self.share()
+        if (world.particle_count, world.spring_count) != self._topology_key: self.partition()
+
+    # ===== Stepping =====
+
+    def step(self, dt: float):
+        world = self.world
+        if world.sleeping: world.update_sleep(dt)
+        self.sync()
+        with world.profiler.stage("workers"):
+            self.broadcast([("step", dt, world.drag_factor(dt), world.solver, world.solver_iterations)] * self.workers)     # returns once every worker is done
+        world.profiler.count("springs", world.spring_count)
+        if world.self_collision:
+            with world.profiler.stage("self_collision"): world.solve_self_collisions()
+
+    def close(self):
+        for conn in self.connections:
+            conn.send(None)
+        for process in self.processes:
+            process.join()
+        # hand the world private copies again before the shared blocks go away
+        for name in SHARED_FIELDS:
+            if getattr(self.world, name) is self.arrays.get(name):
+                setattr(self.world, name, np.array(self.arrays[name]))
+        self.arrays = {}
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
@@ -0,0 +1,157 @@
+import math
+import time
+
+import numpy as np
+
+import kernels
+from pygame_template import V2
+from collisions import Circle, Polygon, Rect, closest_point_on_edges, collide_circle_rect
+from world import SoftBodyWorld, integrate, integrate_numpy, accumulate_spring_forces, spring_forces_numpy
+
+
+# ===== Parity =====
+# The kernels in kernels.py against the code they replace, on random inputs. Run through
+# `python -m cli parity`; with Numba installed the compiled kernels are checked, without it
+# the same scalar source runs as plain Python. Exits non-zero on a mismatch. The XPBD solver is
+# checked against the closed form instead: at rest every spring of a hanging chain stretches
+# by g / k times the particles below it, as the explicit solver's forces would have it.
+
+def reference_circle_rect(pos: V2, radius: float, r) -> tuple | None:
+    # collide_circle_rect before the kernel
+    closest = V2(max(r.left, min(pos.x, r.right)), max(r.top, min(pos.y, r.bottom)))
+    delta = pos - closest
+    distance = delta.length()
+    if distance:
+        if distance >= radius: return None
+        normal = delta / distance
+        return radius - distance, normal.x, normal.y, closest.x, closest.y
+    faces = [(pos.x - r.left, V2(-1, 0)), (r.right - pos.x, V2(1, 0)), (pos.y - r.top, V2(0, -1)), (r.bottom - pos.y, V2(0, 1))]
+    gap, normal = min(faces, key=lambda face: face[0])
+    point = pos + normal * gap
+    return radius + gap, normal.x, normal.y, point.x, point.y
+
+def reference_closest(point, vertices, edges, inv_edge_len_sq) -> tuple:
+    # closest_point_on_edges without the kernel
+    point = np.array((point[0], point[1]))
+    t = ((point - vertices) * edges).sum(axis=1) * inv_edge_len_sq
+    t = np.minimum(np.maximum(t, 0), 1)
+    closest = vertices + edges * t[:, None]
+    dist_sq = ((closest - point) ** 2).sum(axis=1)
+    i = dist_sq.argmin()
+    return math.sqrt(dist_sq[i]), *closest[i]
+
+
+def random_springs(rng: np.random.Generator, n: int, m: int) -> tuple:
+    pos = rng.uniform(0, 500, (n, 2))
+    pos[1] = pos[0]                         # a zero length spring
+    velocity = rng.normal(0, 1, (n, 2))
+    a = rng.integers(0, n, m)
+    b = (a + rng.integers(1, n, m)) % n
+    a[0], b[0] = 0, 1
+    k, damping, rest_len = rng.uniform(0.1, 1, m), rng.uniform(0, 0.1, m), rng.uniform(10, 100, m)
+    return pos, velocity, a, b, k, damping, rest_len
+
+def random_polygon(rng: np.random.Generator) -> Polygon:
+    # star shaped, concave for most draws
+    count = int(rng.integers(3, 24))
+    angle = np.sort(rng.uniform(0, 2 * math.pi, count))
+    radius = rng.uniform(20, 80, count)
+    return Polygon([V2(r * math.cos(t), r * math.sin(t)) for r, t in zip(radius, angle)], V2(*rng.uniform(100, 300, 2)))
+
+
+def per_call(fn, cases: list) -> float:
+    start = time.perf_counter()
+    for case in cases: fn(*case)
+    return (time.perf_counter() - start) / len(cases) * 1e6
+
+
+def check_springs(rng, cases: int) -> dict:
+    error = 0.0
+    for _ in range(cases):
+        pos, velocity, *springs = random_springs(rng, 200, 800)
+        expected = np.zeros_like(pos)
+        spring_forces_numpy(pos, velocity, expected, *springs)
+        # the backend in use, and the scalar source run as plain Python
+        for kernel in (accumulate_spring_forces, kernels.spring_forces_loop.py_func):
+            got = np.zeros_like(pos)
+            kernel(pos, velocity, got, *springs)
+            error = max(error, float(np.abs(got - expected).max() / max(1.0, np.abs(expected).max())))
+    pos, velocity, *springs = random_springs(rng, 10000, 40000)
+    force = np.zeros_like(pos)
+    timed = [(pos, velocity, force, *springs)] * 5
+    return {"kernel": "spring_forces", "max_error": error, "passed": error < 1e-12,
+            "us_reference": per_call(spring_forces_numpy, timed), "us_kernel": per_call(accumulate_spring_forces, timed)}
+
+def check_integrate(rng, cases: int) -> dict:
+    error = 0.0
+    for case in range(cases):
+        pos, velocity, force = rng.normal(0, 100, (3, 300, 2))
+        fixed = rng.random(300) < 0.1 if case % 2 else np.zeros(300, dtype=bool)
+        arrays = [pos.copy(), velocity.copy(), force.copy()]
+        integrate_numpy(*arrays, fixed, 0.5, 0.99)
+        for kernel in (integrate, kernels.integrate_loop.py_func):
+            got = [pos.copy(), velocity.copy(), force.copy()]
+            kernel(*got, fixed, 0.5, 0.99)
+            error = max(error, max(float(np.abs(x - y).max()) for x, y in zip(got, arrays)))
+    pos, velocity, force = rng.normal(0, 100, (3, 10000, 2))
+    timed = [(pos, velocity, force, np.zeros(10000, dtype=bool), 0.5, 0.99)] * 5
+    return {"kernel": "integrate", "max_error": error, "passed": error < 1e-12,
+            "us_reference": per_call(integrate_numpy, timed), "us_kernel": per_call(integrate, timed)}
+
+def check_circle_rect(rng, cases: int) -> dict:
+    error, mismatches, pairs = 0.0, 0, []
+    for _ in range(cases):
+        rect = Rect(V2(*rng.uniform(100, 300, 2)), V2(*rng.uniform(10, 200, 2)))
+        circle = Circle(float(rng.uniform(1, 40)), V2(*rng.uniform(0, 400, 2)))
+        r = rect.rect
+        expected = reference_circle_rect(circle.pos, circle.radius, r)
+        got = kernels.circle_rect(circle.pos.x, circle.pos.y, circle.radius, r.left, r.top, r.right, r.bottom)
+        if expected is None:
+            mismatches += got[0] > 0
+        else:
+            error = max(error, max(abs(x - y) for x, y in zip(got, expected)))
+        pairs.append((circle, rect))
+    reference = lambda circle, rect: reference_circle_rect(circle.pos, circle.radius, rect.rect)
+    return {"kernel": "circle_rect", "max_error": error, "passed": error < 1e-9 and not mismatches,
+            "us_reference": per_call(reference, pairs), "us_kernel": per_call(collide_circle_rect, pairs)}
+
+def check_circle_polygon(rng, cases: int) -> dict:
+    error, mismatches, timed = 0.0, 0, []
+    for _ in range(cases):
+        poly = random_polygon(rng)
+        point = V2(*rng.uniform(50, 350, 2))
+        vertices = poly.world_vertices
+        expected = reference_closest(point, vertices, poly.edges, poly.inv_edge_len_sq)
+        got = kernels.closest_on_edges(point.x, point.y, vertices, poly.edges, poly.inv_edge_len_sq)
+        error = max(error, max(abs(x - y) for x, y in zip(got, expected)))
+        inside = kernels.contains(point.x, point.y, vertices, poly.edges, poly.edge_slopes)
+        mismatches += inside != Polygon.point_in_polygon(point, [V2(*v) for v in vertices])
+        timed.append((point, vertices, poly.edges, poly.inv_edge_len_sq))
+    return {"kernel": "closest_on_edges+contains", "max_error": error, "passed": error < 1e-9 and not mismatches,
+            "us_reference": per_call(reference_closest, timed), "us_kernel": per_call(closest_point_on_edges, timed)}
+
+def check_xpbd_chain(rng, cases: int) -> dict:
+    error = 0.0
+    for _ in range(max(1, cases // 10)):
+        count, k, gravity = int(rng.integers(2, 6)), float(rng.uniform(0.1, 1)), float(rng.uniform(0.05, 0.2))
+        world = SoftBodyWorld()
+        world.solver, world.solver_iterations = "xpbd", 100
+        for i in range(count + 1): world.add_particle((0, 50 * i), 5, i == 0)
+        for i in range(count): world.add_spring(i, i + 1, k, 0.05)
+        for _ in range(2000):
+            world.apply_force((0, gravity))
+            world.step(1.0)
+        stretch = np.diff(world.pos[:count + 1, 1]) - 50
+        expected = gravity / k * np.arange(count, 0, -1)
+        error = max(error, float(np.abs(stretch - expected).max() / expected.max()))
+    return {"kernel": "xpbd_chain", "max_error": error, "passed": error < 1e-3, "us_reference": 0.0, "us_kernel": 0.0}
+
+
+def run_all(cases: int = 50, seed: int = 0) -> list[dict]:
+    kernels.warm_up()       # compile time is not what is measured
+    rng = np.random.default_rng(seed)
+    return [check(rng, cases) for check in (check_springs, check_integrate, check_circle_rect, check_circle_polygon,
+                                           check_xpbd_chain)]
+
+def backend() -> str:
+    return f"numba {kernels.numba.__version__}" if kernels.JIT else "numpy and plain python, numba not installed or disabled"
@@ -0,0 +1,91 @@
+import csv
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+
+# Named stage timers and counters, collected per frame. Disabled, a stage is a shared no-op
+# context manager and counters are skipped, so the hooks can stay in the hot paths.
+
+NULL_STAGE = nullcontext()
+
+
+class Stage:
+    __slots__ = ("frame", "name", "start")
+
+    def __init__(self, frame: dict, name: str):
+        self.frame = frame
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.frame[self.name] = self.frame.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class Profiler:
+    def __init__(self, enabled: bool = False, history: int = 600):
+        self.enabled = enabled
+        self.history: deque[dict] = deque(maxlen=history)    # finished frames, oldest dropped first
+        self.frames: list[dict] = []                         # every finished frame, only while keep_all is set
+        self.keep_all = False                                # headless runs export the whole run
+        self.timings: dict[str, float] = {}                  # seconds per stage, current frame
+        self.counters: dict[str, int] = {}                   # current frame
+
+    def stage(self, name: str):
+        if not self.enabled: return NULL_STAGE
+        return Stage(self.timings, name)
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled: self.counters[name] = self.counters.get(name, 0) + amount
+
+    def end_frame(self):
+        if not self.enabled: return
+        frame = {f"{name}_ms": seconds * 1000 for name, seconds in self.timings.items()}
+        frame.update(self.counters)
+        self.history.append(frame)
+        if self.keep_all: self.frames.append(frame)
+        self.timings, self.counters = {}, {}
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.timings, self.counters = {}, {}
+
+    # ===== Reports =====
+
+    def columns(self, frames) -> list[str]:
+        names = {}
+        for frame in frames: names.update(dict.fromkeys(frame))
+        return sorted(names, key=lambda name: (not name.endswith("_ms"), name))
+
+    def summary(self, frames=None) -> dict[str, dict[str, float]]:
+        frames = list(self.history if frames is None else frames)
+        result = {}
+        for name in self.columns(frames):
+            values = sorted(frame.get(name, 0) for frame in frames)
+            result[name] = {
+                "mean": sum(values) / len(values),
+                "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "max": values[-1],
+            }
+        return result
+
+    def export_csv(self, path: str):
+        frames = self.frames if self.keep_all else list(self.history)
+        columns = self.columns(frames)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + columns)
+            for i, frame in enumerate(frames):
+                writer.writerow([i] + [frame.get(name, 0) for name in columns])
+
+    def export_json(self, path: str):
+        frames = self.frames if self.keep_all else list(self.history)
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(frames), "frames": frames}, f, indent=2)
+
+    def export(self, path: str):
+        if path.endswith(".csv"): self.export_csv(path)
+        else: self.export_json(path)
@@ -0,0 +1,159 @@
+import numpy as np
+
+from world import SoftBodyWorld
+
+
+# ===== Snapshots =====
+# One .npz per checkpoint: the world arrays trimmed to their used length, its settings,
+# and the collidables' positions and sizes in group order.
+
+def place(shape, pos):
+    # teleport, unlike move() the shape does not sweep from its old position;
+    # built with the shape's own vector type so this module needs no pygame_template
+    shape.pos = type(shape.pos)(*pos)
+    if hasattr(shape, "rect"):
+        shape.rect.center = shape.pos
+        shape.prev_rect = shape.rect.copy()
+    if getattr(shape, "broadphase", None): shape.broadphase.update(shape)
+
+def snapshot_state(world: SoftBodyWorld, collidables=()) -> dict[str, np.ndarray]:
+    collidables = list(collidables)
+    state = world.snapshot()
+    state["collidable_pos"] = np.array([tuple(shape.pos) for shape in collidables], dtype=float).reshape(-1, 2)
+    state["collidable_size"] = np.array([tuple(shape.size) for shape in collidables], dtype=float).reshape(-1, 2)
+    return state
+
+def save_snapshot(path: str, world: SoftBodyWorld, collidables=()):
+    with open(path, "wb") as f: np.savez(f, **snapshot_state(world, collidables))
+
+def load_snapshot(path, world: SoftBodyWorld = None, collidables=()) -> SoftBodyWorld:
+    # path may also be an open binary file, e.g. a snapshot received over the network
+    world = world if world is not None else SoftBodyWorld()
+    with np.load(path) as data: state = dict(data)
+    collidables = list(collidables)
+    if collidables and len(collidables) != len(state["collidable_pos"]):
+        raise ValueError(f"snapshot has {len(state['collidable_pos'])} collidables, got {len(collidables)}")
+    world.restore(state)
+    for shape, pos in zip(collidables, state["collidable_pos"]): place(shape, pos)
+    return world
+
+
+# ===== Streaming recording =====
+# File layout: a fixed header, then blocks of `keyframe_interval` frames. Each block opens with a
+# float32 keyframe followed by int16 deltas quantized to 1 / scale px, so every row has a fixed
+# size and frame f is found by arithmetic. A frame is the keyframe plus the sum of the deltas before it.
+# The spring topology and settings go to a snapshot next to the recording.
+
+HEADER = np.dtype([("magic", "S8"), ("particles", "<u4"), ("collidables", "<u4"),
+                   ("keyframe_interval", "<u4"), ("scale", "<f4"), ("frames", "<u8")])
+MAGIC = b"SPRREC01"
+
+
+class Recorder:
+    def __init__(self, path: str, world: SoftBodyWorld, collidables=(), keyframe_interval: int = 300, scale: float = 64):
+        self.path = path
+        self.world = world
+        self.collidables = list(collidables)
+        self.particles = world.particle_count
+        self.keyframe_interval = keyframe_interval
+        self.scale = scale         # deltas are stored in 1 / scale px, int16 covers 32767 / scale px per frame
+
+        self.width = 2 * (self.particles + len(self.collidables))
+        self.block_bytes = self.width * (4 + 2 * (keyframe_interval - 1))
+        self.frames = 0
+
+        save_snapshot(path + ".npz", world, self.collidables)
+        self.file = open(path, "w+b")
+        header = np.zeros(1, dtype=HEADER)
+        header[0] = (MAGIC, self.particles, len(self.collidables), keyframe_interval, scale, 0)
+        self.file.write(header.tobytes())
+        self.file.flush()
+        self.header = np.memmap(self.file, dtype=HEADER, mode="r+", shape=(1,))
+
+        self.keyframe = None
+        self.deltas = None
+        self.key = None         # decoder state: keyframe and summed deltas, so errors never accumulate
+        self.total = None
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def state(self) -> np.ndarray:
+        pos = self.world.pos[:self.particles]
+        if self.collidables:
+            pos = np.concatenate([pos, [tuple(shape.pos) for shape in self.collidables]])
+        return pos.ravel()
+
+    def open_block(self, block: int):
+        offset = HEADER.itemsize + block * self.block_bytes
+        self.file.truncate(offset + self.block_bytes)
+        self.keyframe = np.memmap(self.file, dtype=np.float32, mode="r+", offset=offset, shape=(self.width,))
+        self.deltas = np.memmap(self.file, dtype=np.int16, mode="r+", offset=offset + 4 * self.width,
+                                shape=(self.keyframe_interval - 1, self.width))
+
+    def record(self):
+        if self.world.particle_count != self.particles:
+            raise ValueError("particle count changed while recording, start a new Recorder")
+        state = self.state()
+        block, row = divmod(self.frames, self.keyframe_interval)
+        if row == 0:
+            self.open_block(block)
+            self.keyframe[:] = state
+            self.key = self.keyframe.astype(float)
+            self.total = np.zeros(self.width, dtype=np.int64)
+        else:
+            # encoded against what playback will reconstruct, a clipped jump is caught up over the next frames
+            delta = np.clip(np.rint((state - self.key) * self.scale) - self.total, -32767, 32767).astype(np.int16)
+            self.deltas[row - 1] = delta
+            self.total += delta
+        self.frames += 1
+        self.header["frames"] = self.frames
+
+    def close(self):
+        if self.file.closed: return
+        self.keyframe = self.deltas = None
+        self.header.flush()
+        self.header = None
+        self.file.close()
+
+
+class Playback:
+    def __init__(self, path: str):
+        self.path = path
+        header = np.fromfile(path, dtype=HEADER, count=1)
+        if len(header) == 0 or header[0]["magic"] != MAGIC: raise ValueError(f"{path} is not a recording")
+        header = header[0]
+        self.particles = int(header["particles"])
+        self.collidables = int(header["collidables"])
+        self.keyframe_interval = int(header["keyframe_interval"])
+        self.scale = float(header["scale"])
+        self.frames = int(header["frames"])
+
+        self.width = 2 * (self.particles + self.collidables)
+        self.block_bytes = self.width * (4 + 2 * (self.keyframe_interval - 1))
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+
+    def __len__(self): return self.frames
+
+    def frame(self, index: int) -> tuple[np.ndarray, np.ndarray]:
+        # particle positions and collidable positions, no simulation involved
+        if index < 0: index += self.frames
+        if not 0 <= index < self.frames: raise IndexError(f"frame {index} out of range, recording has {self.frames}")
+        block, row = divmod(index, self.keyframe_interval)
+        start = HEADER.itemsize + block * self.block_bytes
+        key = self.data[start:start + 4 * self.width].view(np.float32).astype(float)
+        start += 4 * self.width
+        deltas = self.data[start:start + 2 * self.width * row].view(np.int16).reshape(row, self.width)
+        state = (key + deltas.sum(axis=0, dtype=np.int64) / self.scale).reshape(-1, 2)
+        return state[:self.particles], state[self.particles:]
+
+    def world(self) -> SoftBodyWorld:
+        # the recorded bodies as they were when recording started, ready for a renderer
+        return load_snapshot(self.path + ".npz")
+
+    def seek(self, world: SoftBodyWorld, index: int, collidables=()):
+        pos, shapes = self.frame(index)
+        world.pos[:self.particles] = pos
+        world.velocity[:self.particles] = 0
+        world.render_pos = None
+        for shape, shape_pos in zip(collidables, shapes): place(shape, shape_pos)
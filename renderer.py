@@ -0,0 +1,160 @@
+import numpy as np
+import pygame
+
+from pygame_template import Color
+from world import SoftBodyWorld
+from profiler import Profiler
+
+
+def spring_paths(a: np.ndarray, b: np.ndarray, n: int) -> list[np.ndarray]:
+    # split the spring graph into edge-disjoint polylines, so a whole row of a grid is one draw call
+    adjacency = [[] for _ in range(n)]
+    for edge, (u, v) in enumerate(zip(a.tolist(), b.tolist())):
+        adjacency[u].append((v, edge))
+        adjacency[v].append((u, edge))
+    used = bytearray(len(a))
+    cursor = [0] * n
+
+    # walks starting on odd-degree vertices end on odd-degree vertices, which keeps paths long
+    starts = [u for u in range(n) if len(adjacency[u]) % 2] + [u for u in range(n) if adjacency[u]]
+    paths = []
+    for start in starts:
+        while True:
+            path, u = [start], start
+            while True:
+                neighbors, i = adjacency[u], cursor[u]
+                while i < len(neighbors) and used[neighbors[i][1]]: i += 1
+                cursor[u] = i
+                if i == len(neighbors): break
+                u, edge = neighbors[i]
+                used[edge] = 1
+                path.append(u)
+            if len(path) == 1: break
+            paths.append(np.array(path))
+    return paths
+
+
+class BatchRenderer:
+    def __init__(self, world: SoftBodyWorld, spring_budget: int = 20000, particle_budget: int = 20000):
+        self.world = world
+        self.spring_budget = spring_budget          # above this only structural springs are drawn
+        self.particle_budget = particle_budget      # above this particles are subsampled
+        self.max_level: int | None = None           # force a spring LOD level, None picks one from the budget
+
+        # None resolves to the template colors on first draw
+        self.spring_color = None
+        self.fill_color = None
+        self.outline_color = None
+
+        self._paths_key = None
+        self._paths = []
+        self._sprites = {}
+
+    # ===== LOD =====
+
+    def spring_level(self) -> int:
+        if self.max_level is not None: return self.max_level
+        m = self.world.spring_count
+        return 2 if m <= self.spring_budget else 0
+
+    def particle_stride(self) -> int:
+        return max(1, -(-self.world.particle_count // self.particle_budget))
+
+    # ===== Caches =====
+
+    def paths(self) -> list[np.ndarray]:
+        world = self.world
+        level = self.spring_level()
+        key = (world.particle_count, world.spring_count, level)
+        if key != self._paths_key:
+            m = world.spring_count
+            keep = world.spring_level[:m] <= level
+            self._paths = spring_paths(world.spring_a[:m][keep], world.spring_b[:m][keep], world.particle_count)
+            self._paths_key = key
+        return self._paths
+
+    def resolve_colors(self):
+        if self.spring_color is None: self.spring_color = Color.white
+        if self.fill_color is None: self.fill_color = Color.gray60
+        if self.outline_color is None: self.outline_color = Color.black
+
+    def sprite(self, radius: float) -> pygame.Surface:
+        sprite = self._sprites.get(radius)
+        if sprite is None:
+            size = int(radius * 2)
+            sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, self.fill_color, (radius, radius), radius)
+            pygame.draw.circle(sprite, self.outline_color, (radius, radius), radius, 2)
+            self._sprites[radius] = sprite
+        return sprite
+
+    # ===== Drawing =====
+
+    def positions(self) -> np.ndarray:
+        world = self.world
+        n = world.particle_count
+        if world.render_pos is not None and len(world.render_pos) == n: return world.render_pos
+        return world.pos[:n]
+
+    def draw_springs(self, screen: pygame.Surface, pos: np.ndarray):
+        for path in self.paths():
+            pygame.draw.lines(screen, self.spring_color, False, pos[path].tolist(), 1)
+
+    def draw_particles(self, screen: pygame.Surface, pos: np.ndarray):
+        n = self.world.particle_count
+        index = np.arange(0, n, self.particle_stride())
+        radius = self.world.radius[index]
+        corners = (pos[index] - radius[:, None]).tolist()
+        sprites = [self.sprite(r) for r in radius.tolist()]
+        screen.blits(list(zip(sprites, corners)), doreturn=False)
+
+    def draw(self, screen: pygame.Surface):
+        self.resolve_colors()
+        pos = self.positions()
+        self.draw_springs(screen, pos)
+        self.draw_particles(screen, pos)
+
+
+class ProfileOverlay:
+    def __init__(self, profiler: Profiler, budget_ms: float = 1000 / 60, window: int = 60):
+        self.profiler = profiler
+        self.budget_ms = budget_ms      # frame budget the stage bars are scaled against
+        self.window = window            # frames averaged per line
+        self.color = None               # template colors, resolved on first draw
+        self.bar_color = None
+        self.background = (0, 0, 0, 170)
+        self._font = None
+
+    @property
+    def font(self) -> pygame.font.Font:
+        if self._font is None: self._font = pygame.font.SysFont("monospace", 14)
+        return self._font
+
+    def lines(self) -> list[tuple[str, float]]:
+        history = self.profiler.history
+        frames = [history[i] for i in range(max(0, len(history) - self.window), len(history))]
+        if not frames: return [("collecting...", 0)]
+        lines = []
+        total = 0.0
+        for name, stats in self.profiler.summary(frames).items():
+            if name.endswith("_ms"):
+                total += stats["mean"]
+                lines.append((f"{name[:-3]:<16}{stats['mean']:7.2f} ms  max {stats['max']:6.2f}", stats["mean"]))
+            else:
+                lines.append((f"{name:<16}{stats['mean']:9.0f}", 0))
+        lines.insert(0, (f"{'total':<16}{total:7.2f} ms / {self.budget_ms:.1f}", total))
+        return lines
+
+    def draw(self, screen: pygame.Surface):
+        if not self.profiler.enabled: return
+        if self.color is None: self.color = Color.white
+        if self.bar_color is None: self.bar_color = Color.yellow
+        lines = self.lines()
+        height = self.font.get_linesize()
+        panel = pygame.Surface((360, height * len(lines) + 8), pygame.SRCALPHA)
+        panel.fill(self.background)
+        for i, (text, ms) in enumerate(lines):
+            y = 4 + i * height
+            if ms: pygame.draw.rect(panel, self.bar_color, (4, y + height - 3, min(ms / self.budget_ms, 1) * 352, 2))
+            panel.blit(self.font.render(text, True, self.color), (4, y))
+        screen.blit(panel, (10, 10))
@@ -0,0 +1,148 @@
+import numpy as np
+import pygame
+
+from pygame_template import APP, Group, V2
+from broadphase import SpatialHash
+from collisions import Rect, aabb
+from world import SoftBodyWorld
+from bodies import BodyTemplate
+from classes import ParticleCollider, Shape
+from scheduler import PhysicsScheduler
+from renderer import BatchRenderer, ProfileOverlay
+from recording import save_snapshot, load_snapshot
+from contacts import ContactSolver
+import kernels
+
+
+SCENES = {
+    "jelly_quad": Shape.get_jelly_quad,
+    "jelly_circle": Shape.get_jelly_circle,
+}
+
+
+class Scene:
+    def __init__(self, name: str = "jelly_quad", substeps: int = 2, max_steps: int = 5, workers: int = 0, solver: str = "explicit",
+                 ccd: bool = True, contact_iterations: int = 8):
+        self.collidables = Group()
+
+        self.draw_layer = Group()
+
+        self.apply_gravity = True
+
+        if kernels.JIT: kernels.warm_up()     # loads the compiled kernels now instead of stalling the first frame
+        self.world = SoftBodyWorld()
+        self.profiler = self.world.profiler     # F3 in the window, --profile on the command line
+        self.world.solver = solver
+        self.world.self_collision = True        # lets several jelly bodies share the scene
+        self.world.sleeping = True              # resting bodies stop integrating until something disturbs them
+        # no sprite per particle or spring: BatchRenderer draws the arrays, collisions go through slotted handles
+        self.by_index: list[ParticleCollider] = SCENES[name](None, None, None, self.world)
+
+        # particles moving further than their radius in one step are swept against the collidables
+        self.ccd = ccd
+        self.step_start = None
+
+        # contacts are solved together with restitution and friction, warm started from the last step;
+        # 0 iterations falls back to pushing out of each shape in turn and stopping the particle
+        self.contacts = ContactSolver(self.world, iterations=contact_iterations) if contact_iterations else None
+
+        # ===== Collidales =====
+        things = [
+            [V2(APP.HW, 10), V2(APP.W, 20)],
+            [V2(APP.HW, APP.H - 10), V2(APP.W, 20)],
+            [V2(10, APP.HH), V2(20, APP.H)],
+            [V2(APP.W - 10, APP.HH), V2(20, APP.H)]
+        ]
+        for pos, size in things:
+            Rect(pos, size, self.collidables, self.draw_layer)
+        self.platform = Rect(V2(APP.HW, APP.H - 100), V2(300,200), self.collidables, self.draw_layer)
+
+        self.broadphase = SpatialHash(cell_size=64)
+        for collidable in self.collidables:
+            self.broadphase.insert(collidable)
+
+        self.stepper = None
+        if workers:
+            from parallel import ParallelStepper
+            self.stepper = ParallelStepper(self.world, workers)
+
+        self.scheduler = PhysicsScheduler(self.world, step=1.0, substeps=substeps, max_steps=max_steps,
+                                          pre_step=self.apply_forces, post_step=self.resolve_collisions, stepper=self.stepper)
+        self.renderer = BatchRenderer(self.world)
+        self.overlay = ProfileOverlay(self.profiler)
+
+    def close(self):
+        if self.stepper: self.stepper.close()
+
+    def spawn(self, template: BodyTemplate, offset) -> list[ParticleCollider]:
+        parts = Shape.spawn(template, offset, None, None, None, self.world)
+        self.by_index.extend(parts)
+        return parts
+
+    def save(self, path: str):
+        save_snapshot(path, self.world, self.collidables)
+
+    def load(self, path: str):
+        # the handles index into the world arrays, so only a snapshot of this same scene fits
+        with np.load(path) as data: counts = len(data["pos"]), len(data["spring_a"])
+        if counts != (self.world.particle_count, self.world.spring_count):
+            raise ValueError(f"snapshot holds {counts[0]} particles and {counts[1]} springs, this scene has "
+                             f"{self.world.particle_count} and {self.world.spring_count}")
+        load_snapshot(path, self.world, self.collidables)
+        if self.contacts: self.contacts.clear()
+        self.scheduler.prev_pos = self.world.pos[:self.world.particle_count].copy()
+
+    def toggle_gravity(self):
+        self.apply_gravity = not self.apply_gravity
+        self.world.wake_all()
+
+    def apply_forces(self, dt):
+        # ccd sweeps from here, the contact solver takes back slides that static friction holds
+        if self.ccd or self.contacts: self.step_start = self.world.pos[:self.world.particle_count].copy()
+        if self.apply_gravity:
+            self.world.apply_force()        # defualt is gravity
+
+    def resolve_collisions(self, dt):
+        awake = self.world.awake_particles()
+        by_index = self.by_index
+        particles = by_index if awake is None else [by_index[i] for i in np.flatnonzero(awake).tolist()]
+        if self.ccd and self.step_start is not None:
+            with self.profiler.stage("ccd"):
+                self.sweep_fast_particles()
+        # queried up front so both phases can be timed, a particle only ever moves itself
+        with self.profiler.stage("broad_phase"):
+            candidates = [(p, self.broadphase.query_circle(p.pos, p.radius)) for p in particles]
+        with self.profiler.stage("narrow_phase"):
+            if self.contacts: hits = self.contacts.solve(candidates, dt, self.step_start)
+            else: hits = sum(particle.collition_check_and_resolve(shapes) for particle, shapes in candidates)
+        if self.profiler.enabled:
+            self.profiler.count("collision_tests", sum(len(shapes) for _, shapes in candidates))
+            self.profiler.count("hits", hits)
+            if self.contacts:
+                self.profiler.count("contact_iterations", self.contacts.iterations_used)
+                self.profiler.count("warm_started", self.contacts.warm_started)
+
+    def sweep_fast_particles(self):
+        n = self.world.particle_count
+        start = self.step_start
+        if len(start) != n: return
+        moved = self.world.pos[:n] - start
+        fast = np.flatnonzero((moved * moved).sum(axis=1) > self.world.radius[:n] ** 2)
+        self.profiler.count("ccd_sweeps", len(fast))
+        for i in fast.tolist():
+            self.by_index[i].sweep_and_resolve(V2(*start[i]), self.broadphase, keep_tangent=self.contacts is not None)
+
+    def update(self, frame_dt: float, move_direction: V2 = V2()):
+        self.platform.move(move_direction, frame_dt, 5)
+        if move_direction.length_squared():
+            self.world.wake_in_box(*aabb(self.platform))
+        self.scheduler.advance(frame_dt)
+
+    def draw(self):
+        # self.draw_layer.draw()
+        screen = pygame.display.get_surface()
+        with self.profiler.stage("render"):
+            self.renderer.draw(screen)
+            self.collidables.draw()
+        self.overlay.draw(screen)
+        self.profiler.end_frame()
@@ -0,0 +1,60 @@
+from typing import Callable
+
+import numpy as np
+
+from world import SoftBodyWorld
+
+
+class PhysicsScheduler:
+    def __init__(self, world: SoftBodyWorld, step: float = 1.0, substeps: int = 1, max_steps: int = 5,
+                 pre_step: Callable[[float], None] = None, post_step: Callable[[float], None] = None, stepper=None):
+        self.world = world
+        self.stepper = stepper or world    # anything with step(dt), e.g. a ParallelStepper over the same world
+        self.step = step                # fixed simulation step, in the same units as APP.dt
+        self.substeps = substeps        # world steps per fixed step
+        self.max_steps = max_steps      # cap per rendered frame, the backlog past it is dropped
+        self.pre_step = pre_step        # e.g. gravity, called before every substep
+        self.post_step = post_step      # e.g. collisions, called after every substep
+
+        self.accumulator = 0.0
+        self.steps_taken = 0
+        self.prev_pos = world.pos[:world.particle_count].copy()
+
+    @property
+    def substep_dt(self) -> float:
+        return self.step / self.substeps
+
+    @property
+    def alpha(self) -> float:
+        return self.accumulator / self.step
+
+    def tick(self):
+        dt = self.substep_dt
+        for _ in range(self.substeps):
+            if self.pre_step: self.pre_step(dt)
+            self.stepper.step(dt)
+            if self.post_step: self.post_step(dt)
+        self.steps_taken += 1
+
+    def advance(self, frame_dt: float) -> int:
+        self.accumulator += frame_dt
+        steps = 0
+        while self.accumulator >= self.step and steps < self.max_steps:
+            self.prev_pos = self.world.pos[:self.world.particle_count].copy()
+            self.tick()
+            self.accumulator -= self.step
+            steps += 1
+
+        # spiral of death guard: fall behind real time instead of queueing more work
+        if self.accumulator >= self.step: self.accumulator %= self.step
+
+        self.interpolate()
+        return steps
+
+    def interpolate(self):
+        world = self.world
+        current = world.pos[:world.particle_count]
+        prev = self.prev_pos
+        if len(prev) != len(current):
+            prev = np.concatenate([prev[:len(current)], current[len(prev):]])
+        world.render_pos = prev + (current - prev) * self.alpha
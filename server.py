@@ -0,0 +1,254 @@
+import asyncio
+import io
+import selectors
+import socket
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from recording import snapshot_state
+from world import SoftBodyWorld
+
+
+# ===== Wire format =====
+# Every message is a little-endian u32 length, a one byte kind, then the payload.
+# Positions (particles, then collidables) are quantized to 1 / scale px on an integer grid;
+# DELTA carries the int16 change of that grid since the previous tick, KEYFRAME the int32 grid
+# itself, both zlib compressed. Integer deltas over a reliable stream never drift.
+
+HELLO, KEYFRAME, DELTA, INPUT = b"HKDI"      # HELLO carries an .npz snapshot with the topology
+FRAME_HEADER = struct.Struct("<IB")
+TICK = struct.Struct("<I")
+DIRECTION = struct.Struct("<ff")
+
+def pack(kind: int, payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload) + 1, kind) + payload
+
+
+class Viewer:
+    __slots__ = ("writer", "direction", "stale")
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.direction = (0.0, 0.0)     # latest input, replaces get_2d_input_dir() on the server
+        self.stale = False              # skipped deltas while its socket was backed up, needs a keyframe
+
+
+class SimulationServer:
+    def __init__(self, scene, host: str = "127.0.0.1", port: int = 8765, tick_rate: float = 60,
+                 scale: float = 64, max_buffer: int = 1 << 20):
+        self.scene = scene
+        self.host = host
+        self.port = port
+        self.tick_rate = tick_rate
+        self.scale = scale
+        self.max_buffer = max_buffer    # bytes queued for one viewer before it stops getting deltas
+
+        self.viewers: set[Viewer] = set()
+        self.handlers: set[asyncio.Task] = set()     # awaited on shutdown, so none is left to be cancelled
+        self.tick = 0
+        self.grid = None                # last broadcast positions, quantized
+        self._topology_key = None
+        self._hello = None
+        self.bytes_sent = 0
+        self.server: asyncio.AbstractServer | None = None
+
+    # ===== Encoding =====
+
+    def state(self) -> np.ndarray:
+        world = self.scene.world
+        pos = world.pos[:world.particle_count]
+        shapes = [tuple(shape.pos) for shape in self.scene.collidables]
+        return np.concatenate([pos, np.reshape(shapes, (-1, 2))]).ravel()
+
+    def hello(self) -> bytes:
+        world = self.scene.world
+        key = (world.particle_count, world.spring_count)
+        if key != self._topology_key:
+            buffer = io.BytesIO()
+            np.savez(buffer, **snapshot_state(world, self.scene.collidables), scale=self.scale, tick_rate=self.tick_rate)
+            self._hello = pack(HELLO, buffer.getvalue())
+            self._topology_key = key
+        return self._hello
+
+    def keyframe(self) -> bytes:
+        return pack(KEYFRAME, TICK.pack(self.tick) + zlib.compress(self.grid.astype("<i4").tobytes(), 1))
+
+    def encode(self) -> bytes:
+        # the message every up to date viewer gets this tick
+        previous = self.grid
+        topology = (self.scene.world.particle_count, self.scene.world.spring_count)
+        self.grid = np.rint(self.state() * self.scale).astype(np.int64)
+        if previous is None or len(previous) != len(self.grid) or topology != self._topology_key:
+            return self.hello() + self.keyframe()
+        delta = self.grid - previous
+        if np.abs(delta).max(initial=0) > 32767: return self.keyframe()
+        return pack(DELTA, TICK.pack(self.tick) + zlib.compress(delta.astype("<i2").tobytes(), 1))
+
+    # ===== Connections =====
+
+    def send(self, viewer: Viewer, message: bytes):
+        viewer.writer.write(message)
+        self.bytes_sent += len(message)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        viewer = Viewer(writer)
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.grid is not None: self.send(viewer, self.hello() + self.keyframe())
+        else: viewer.stale = True
+        self.viewers.add(viewer)
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                length, kind = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                payload = await reader.readexactly(length - 1)
+                if kind == INPUT: viewer.direction = DIRECTION.unpack(payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.viewers.discard(viewer)
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+    def move_direction(self):
+        # every viewer steers the platform, held keys add up and are clamped to unit length
+        x = sum(viewer.direction[0] for viewer in self.viewers)
+        y = sum(viewer.direction[1] for viewer in self.viewers)
+        length = (x * x + y * y) ** 0.5
+        if length > 1: x, y = x / length, y / length
+        return x, y
+
+    def broadcast(self):
+        message = self.encode()
+        for viewer in list(self.viewers):
+            if viewer.writer.is_closing(): continue
+            backlog = viewer.writer.transport.get_write_buffer_size()
+            if backlog > self.max_buffer:
+                # a slow viewer never holds back the simulation, it catches up with a keyframe later
+                viewer.stale = True
+            elif viewer.stale:
+                if backlog == 0:
+                    self.send(viewer, self.hello() + self.keyframe())
+                    viewer.stale = False
+            else:
+                self.send(viewer, message)
+
+    # ===== Loop =====
+
+    def step(self):
+        from pygame_template import V2      # here rather than at the top, clients stay free of pygame_template
+        self.scene.update(60 / self.tick_rate, V2(self.move_direction()))     # dt is in 60 FPS frames
+        self.tick += 1
+        self.broadcast()
+
+    async def run(self, ticks: int = None):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]      # port 0 picks a free one
+        period = 1 / self.tick_rate
+        next_tick = time.perf_counter()
+        try:
+            while ticks is None or self.tick < ticks:
+                self.step()
+                # fixed tick: sleep off what is left, a late tick starts the next one right away
+                next_tick = max(next_tick + period, time.perf_counter() - period)
+                await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+        finally:
+            self.server.close()
+            # a closed writer ends its handler's read with EOF, the handlers then return on their own
+            for viewer in list(self.viewers): viewer.writer.close()
+            await asyncio.gather(*self.handlers, return_exceptions=True)
+            await self.server.wait_closed()
+
+
+# ===== Client =====
+# Blocking-free and loop-agnostic, so a pygame viewer can poll it once per frame.
+
+class SimulationClient:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, timeout: float = 5):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.sock, selectors.EVENT_READ)
+        self.buffer = bytearray()
+        self.closed = False
+
+        self.world: SoftBodyWorld | None = None
+        self.collidable_pos = np.zeros((0, 2))
+        self.collidable_size = np.zeros((0, 2))
+        self.scale = 1.0
+        self.tick_rate = 60.0
+        self.grid = None
+        self.tick = -1
+        self.bytes_received = 0
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def close(self):
+        if self.closed: return
+        self.closed = True
+        self.selector.close()
+        self.sock.close()
+
+    def send_input(self, direction):
+        if self.closed: return
+        self.sock.setblocking(True)
+        try: self.sock.sendall(pack(INPUT, DIRECTION.pack(float(direction[0]), float(direction[1]))))
+        finally: self.sock.setblocking(False)
+
+    def poll(self, timeout: float = 0) -> int:
+        # reads whatever has arrived, waiting up to timeout for the first bytes; returns ticks applied
+        if self.closed: return 0
+        if timeout and not self.selector.select(timeout): return 0
+        while True:
+            try: chunk = self.sock.recv(1 << 16)
+            except (BlockingIOError, InterruptedError): break
+            if not chunk:
+                self.close()
+                break
+            self.buffer += chunk
+            self.bytes_received += len(chunk)
+        return self.parse()
+
+    def parse(self) -> int:
+        applied, offset = 0, 0
+        buffer = self.buffer
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            length, kind = FRAME_HEADER.unpack_from(buffer, offset)
+            end = offset + 4 + length
+            if len(buffer) < end: break
+            payload = bytes(buffer[offset + FRAME_HEADER.size:end])
+            offset = end
+            if kind == HELLO: self.apply_hello(payload)
+            elif kind in (KEYFRAME, DELTA): applied += self.apply_frame(kind, payload)
+        del buffer[:offset]
+        return applied
+
+    def apply_hello(self, payload: bytes):
+        with np.load(io.BytesIO(payload)) as data: state = dict(data)
+        self.world = SoftBodyWorld()
+        self.world.restore(state)
+        self.collidable_pos = state["collidable_pos"]
+        self.collidable_size = state["collidable_size"]
+        self.scale = float(state["scale"])
+        self.tick_rate = float(state["tick_rate"])
+        self.grid = None
+
+    def apply_frame(self, kind: int, payload: bytes) -> int:
+        (tick,) = TICK.unpack_from(payload)
+        data = zlib.decompress(payload[TICK.size:])
+        if kind == KEYFRAME:
+            self.grid = np.frombuffer(data, dtype="<i4").astype(np.int64)
+        elif self.grid is None:
+            return 0     # joined mid-delta, wait for the keyframe
+        else:
+            self.grid += np.frombuffer(data, dtype="<i2")
+        self.tick = tick
+        state = (self.grid / self.scale).reshape(-1, 2)
+        n = self.world.particle_count
+        self.world.pos[:n] = state[:n]
+        self.collidable_pos = state[n:]
+        return 1
@@ -0,0 +1,39 @@
+import sys
+
+import pygame
+
+from pygame_template import APP, Color, get_2d_input_dir
+
+from renderer import BatchRenderer
+from server import SimulationClient
+
+
+# Thin client for `python -m cli serve`: draws what the server streams and sends the input direction.
+# usage: python viewer.py [host] [port]
+
+class run(APP):
+    def setup(self):
+        host = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+        self.client = SimulationClient(host, port)
+        self.renderer = None
+        self.direction = (0, 0)
+
+    def update(self):
+        direction = tuple(get_2d_input_dir())
+        if direction != self.direction:
+            self.client.send_input(direction)
+            self.direction = direction
+        self.client.poll()
+        if self.client.world is not None and (self.renderer is None or self.renderer.world is not self.client.world):
+            self.renderer = BatchRenderer(self.client.world)
+
+    def draw(self):
+        if self.renderer is None: return
+        screen = pygame.display.get_surface()
+        self.renderer.draw(screen)
+        for center, size in zip(self.client.collidable_pos.tolist(), self.client.collidable_size.tolist()):
+            pygame.draw.rect(screen, Color.gray60, pygame.FRect((0, 0), size).move_to(center=center))
+
+if __name__ == "__main__":
+    run()
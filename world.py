@@ -0,0 +1,549 @@
+import math
+
+import numpy as np
+
+from profiler import Profiler
+from kernels import JIT, integrate_loop, spring_forces_loop, xpbd_constraints_loop, xpbd_damping_loop
+
+# ===== Kernels =====
+# Plain functions over array slices, shared by SoftBodyWorld and the parallel island workers.
+# With Numba installed the compiled loops in kernels.py take over.
+
+def spring_forces_numpy(pos, velocity, force, a, b, k, damping, rest_len):
+    n = len(force)
+    delta = pos[a] - pos[b]
+    dist = np.hypot(delta[:, 0], delta[:, 1])
+    stretched = dist > 0
+    direction = delta / np.where(stretched, dist, 1)[:, None]
+
+    relative_velocity = velocity[a] - velocity[b]
+    closing = np.einsum("ij,ij->i", relative_velocity, direction)
+    magnitude = -k * (dist - rest_len) - damping * closing
+    magnitude[~stretched] = 0
+
+    # scatter: +f onto every a, -f onto every b (fixed particles discard it in integrate)
+    for axis in (0, 1):
+        f = direction[:, axis] * magnitude
+        force[:, axis] += np.bincount(a, f, minlength=n) - np.bincount(b, f, minlength=n)
+
+def integrate_numpy(pos, velocity, force, fixed, dt, drag):
+    if fixed.any():
+        free = ~fixed
+        v = (velocity[free] + force[free] * dt) * drag
+        velocity[free] = v
+        pos[free] += v * dt
+    else:
+        velocity += force * dt
+        velocity *= drag
+        pos += velocity * dt
+    force[:] = 0
+
+accumulate_spring_forces = spring_forces_loop if JIT else spring_forces_numpy
+integrate = integrate_loop if JIT else integrate_numpy
+
+def spring_colors(n, a, b) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    # greedy coloring, each spring takes the lowest color free at both ends; (springs, a ends, b ends)
+    # per color, no two springs of a color share a particle. Callers cache it per topology
+    used = [0] * n      # bit c set: the particle already has a spring of color c
+    color = np.empty(len(a), dtype=np.intp)
+    for s, (i, j) in enumerate(zip(a.tolist(), b.tolist())):
+        taken = used[i] | used[j]
+        c = (~taken & (taken + 1)).bit_length() - 1
+        color[s] = c
+        used[i] |= 1 << c
+        used[j] |= 1 << c
+    order = np.argsort(color, kind="stable")
+    return [(springs, a[springs], b[springs]) for springs in np.split(order, np.flatnonzero(np.diff(color[order])) + 1)]
+
+def xpbd_step(pos, velocity, force, fixed, a, b, k, damping, rest_len, dt, drag, iterations, colors=None):
+    # position based: springs become distance constraints with compliance 1/k. Springs are solved a color
+    # at a time, no two in a color share a particle, so each gets its full correction and the accumulated
+    # multiplier is exactly what moved the particles (Gauss-Seidel between colors; with Numba, between
+    # single springs, which needs no colors). Unconditionally stable. colors: spring_colors(len(pos), a, b)
+    n = len(pos)
+    inv_mass = (~fixed).astype(float)
+    free = inv_mass[:, None]
+    velocity += force * dt * free
+    start = pos.copy()
+    pos += velocity * dt * free
+    force[:] = 0
+    if len(a) == 0:
+        velocity *= 1 - (1 - drag) * free
+        return
+
+    compliance = np.divide(1, k * dt * dt, out=np.zeros_like(k), where=k > 0)
+    if JIT:
+        xpbd_constraints_loop(pos, a, b, inv_mass, rest_len, compliance, iterations)
+        velocity[:] = np.where(free > 0, (pos - start) / dt, velocity)
+        xpbd_damping_loop(pos, velocity, a, b, inv_mass, damping, dt)
+        velocity *= 1 - (1 - drag) * free
+        return
+
+    # per color: what the masses and dt make of it this step
+    solve = []
+    for springs, ca, cb in colors if colors is not None else spring_colors(n, a, b):
+        wa, wb = inv_mass[ca], inv_mass[cb]
+        denominator = wa + wb + compliance[springs]
+        active = (k[springs] > 0) & (denominator > 0)
+        inv_denominator = np.divide(1, denominator, out=np.zeros_like(denominator), where=active)
+        solve.append((springs, ca, cb, wa, wb, rest_len[springs], compliance[springs], inv_denominator, np.zeros(len(springs))))
+
+    for _ in range(iterations):
+        for _, ca, cb, wa, wb, rest, alpha, inv_denominator, lam in solve:
+            delta = pos[ca] - pos[cb]
+            dist = np.hypot(delta[:, 0], delta[:, 1])
+            d_lam = (rest - dist - alpha * lam) * inv_denominator
+            d_lam[dist == 0] = 0
+            lam += d_lam
+            step = delta * (d_lam / np.where(dist > 0, dist, 1))[:, None]
+            pos[ca] += step * wa[:, None]
+            pos[cb] -= step * wb[:, None]
+
+    velocity[:] = np.where(free > 0, (pos - start) / dt, velocity)
+
+    # spring damping as a clamped relative-velocity relaxation along each spring
+    for springs, ca, cb, wa, wb, *_ in solve:
+        delta = pos[ca] - pos[cb]
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        normal = delta / np.where(dist > 0, dist, 1)[:, None]
+        closing = np.einsum("ij,ij->i", velocity[ca] - velocity[cb], normal)
+        weight = wa + wb
+        relax = np.minimum(damping[springs] * dt, 1) * closing / np.where(weight > 0, weight, 1)
+        velocity[ca] -= normal * (relax * wa)[:, None]
+        velocity[cb] += normal * (relax * wb)[:, None]
+    velocity *= 1 - (1 - drag) * free
+
+def connected_components(n, a, b) -> np.ndarray:
+    # label propagation with pointer jumping, returns a component id in 0..k-1 per particle
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[a], labels[b])
+        hooked = labels.copy()
+        for ends in (a, b, labels[a], labels[b]):
+            np.minimum.at(hooked, ends, low)
+        hooked = hooked[hooked]
+        if np.array_equal(hooked, labels): break
+        labels = hooked
+    return np.unique(labels, return_inverse=True)[1]
+
+
+class SoftBodyWorld:
+    _default = None
+
+    PARTICLE_FIELDS = ("pos", "velocity", "force", "radius", "fixed", "asleep")
+    SPRING_FIELDS = ("spring_a", "spring_b", "k", "damping", "rest_len", "spring_level")
+
+    SETTINGS = ("drag_per_second", "solver", "solver_iterations", "self_collision", "collision_iterations",
+                "sleeping", "sleep_energy", "sleep_delay")
+
+    NEIGHBOR_CELLS = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))   # half stencil, every cell pair visited once
+
+    # dt is measured in frames of a 60 FPS loop, same as APP.dt
+    TIME_UNIT = 1 / 60
+
+    def __init__(self, capacity: int = 64, spring_capacity: int = 256, drag_per_second: float = 0.998 ** 60):
+        self.drag_per_second = drag_per_second      # fraction of velocity kept after one simulated second
+        self.render_pos = None                      # interpolated positions, written by PhysicsScheduler
+        self.profiler = Profiler()                  # disabled unless a scene turns it on
+        self._islands_key = None
+        self._island_labels = None
+        self._colors_key = None
+        self._spring_colors = None
+        self.solver = "explicit"        # "explicit" force integration or "xpbd" distance constraints, stable at large dt
+        self.solver_iterations = 10
+        self.self_collision = False
+        self.collision_iterations = 2
+
+        # ===== Sleeping =====
+        self.sleeping = False           # let resting islands stop integrating
+        self.sleep_energy = 0.01        # mean kinetic energy per particle below which an island counts as resting
+        self.sleep_delay = 60           # simulated time an island must rest before it falls asleep
+        self._sleep_key = None
+        self.island_asleep = np.zeros(0, dtype=bool)
+        self.island_rest_time = np.zeros(0)
+        self.island_bounds = np.zeros((0, 4))     # left, top, right, bottom, valid while asleep
+
+        # ===== Particles =====
+        self.particle_count = 0
+        self.pos = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.force = np.zeros((capacity, 2))
+        self.radius = np.zeros(capacity)
+        self.fixed = np.zeros(capacity, dtype=bool)
+        self.asleep = np.zeros(capacity, dtype=bool)     # mirrors island_asleep per particle
+
+        # ===== Springs =====
+        self.spring_count = 0
+        self.spring_a = np.zeros(spring_capacity, dtype=np.intp)
+        self.spring_b = np.zeros(spring_capacity, dtype=np.intp)
+        self.k = np.zeros(spring_capacity)
+        self.damping = np.zeros(spring_capacity)
+        self.rest_len = np.zeros(spring_capacity)
+        self.spring_level = np.zeros(spring_capacity, dtype=np.int8)    # 0 structural, 1 shear, 2 bend; used for LOD
+
+    @classmethod
+    def default(cls) -> "SoftBodyWorld":
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    # STORAGE
+
+    def _reserve(self, fields, used: int, extra: int):
+        capacity = len(getattr(self, fields[0]))
+        if used + extra <= capacity: return
+        while capacity < used + extra: capacity = max(capacity * 2, 1)
+        for name in fields:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:used] = old[:used]
+            setattr(self, name, new)
+
+    def add_particle(self, pos, radius=10, fixed=False) -> int:
+        i = self.particle_count
+        self._reserve(self.PARTICLE_FIELDS, i, 1)
+        self.pos[i] = pos[0], pos[1]
+        self.velocity[i] = self.force[i] = 0
+        self.radius[i] = radius
+        self.fixed[i] = fixed
+        self.asleep[i] = False
+        self.particle_count = i + 1
+        return i
+
+    def add_particles(self, positions, radius=10, fixed=False) -> np.ndarray:
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        count = len(positions)
+        start = self.particle_count
+        self._reserve(self.PARTICLE_FIELDS, start, count)
+        end = start + count
+        self.pos[start:end] = positions
+        self.velocity[start:end] = 0
+        self.force[start:end] = 0
+        self.radius[start:end] = radius
+        self.fixed[start:end] = fixed
+        self.asleep[start:end] = False
+        self.particle_count = end
+        return np.arange(start, end)
+
+    def add_spring(self, a: int, b: int, k=1, damping=0.01, level=0) -> int:
+        i = self.spring_count
+        self._reserve(self.SPRING_FIELDS, i, 1)
+        self.spring_a[i] = a
+        self.spring_b[i] = b
+        self.k[i] = k
+        self.damping[i] = damping
+        self.spring_level[i] = level
+        dx, dy = self.pos[a] - self.pos[b]
+        self.rest_len[i] = math.hypot(dx, dy)
+        self.spring_count = i + 1
+        return i
+
+    def add_springs(self, a, b, k=1, damping=0.01, level=0) -> np.ndarray:
+        a = np.asarray(a, dtype=np.intp).ravel()
+        b = np.asarray(b, dtype=np.intp).ravel()
+        count = len(a)
+        start = self.spring_count
+        self._reserve(self.SPRING_FIELDS, start, count)
+        end = start + count
+        self.spring_a[start:end] = a
+        self.spring_b[start:end] = b
+        self.k[start:end] = k
+        self.damping[start:end] = damping
+        self.spring_level[start:end] = level
+        self.rest_len[start:end] = np.linalg.norm(self.pos[a] - self.pos[b], axis=1)
+        self.spring_count = end
+        return np.arange(start, end)
+
+    # PERSISTENCE
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        # plain arrays trimmed to the used length, ready for np.savez
+        n, m = self.particle_count, self.spring_count
+        state = {name: getattr(self, name)[:n].copy() for name in self.PARTICLE_FIELDS}
+        state.update({name: getattr(self, name)[:m].copy() for name in self.SPRING_FIELDS})
+        state.update({name: np.asarray(getattr(self, name)) for name in self.SETTINGS})
+        if self._sleep_key is not None and self._sleep_key == self._islands_key:
+            state.update(island_asleep=self.island_asleep.copy(), island_rest_time=self.island_rest_time.copy(),
+                         island_bounds=self.island_bounds.copy())
+        return state
+
+    def restore(self, state: dict):
+        # writes into the existing arrays when they are large enough, so shared views stay valid
+        n, m = len(state["pos"]), len(state["spring_a"])
+        self._reserve(self.PARTICLE_FIELDS, 0, n)
+        self._reserve(self.SPRING_FIELDS, 0, m)
+        for name in self.PARTICLE_FIELDS: getattr(self, name)[:n] = state[name]
+        for name in self.SPRING_FIELDS: getattr(self, name)[:m] = state[name]
+        for name in self.SETTINGS:
+            if name in state: setattr(self, name, state[name].item())
+        self.particle_count, self.spring_count = n, m
+        self.render_pos = None
+        self._islands_key = self._sleep_key = self._colors_key = None
+
+        if "island_asleep" in state:
+            labels = self.sync_sleep_state()
+            if len(state["island_asleep"]) == len(self.island_asleep):
+                self.island_asleep = np.array(state["island_asleep"], dtype=bool)
+                self.island_rest_time = np.array(state["island_rest_time"], dtype=float)
+                self.island_bounds = np.array(state["island_bounds"], dtype=float)
+                self.asleep[:n] = self.island_asleep[labels]
+
+    def particle(self, index: int) -> "ParticleRef":
+        return ParticleRef(self, index)
+
+    def island_labels(self) -> np.ndarray:
+        # connected components of the spring graph, cached until particles or springs are added
+        key = (self.particle_count, self.spring_count)
+        if key != self._islands_key:
+            m = self.spring_count
+            self._island_labels = connected_components(self.particle_count, self.spring_a[:m], self.spring_b[:m])
+            self._islands_key = key
+        return self._island_labels
+
+    def spring_colors(self) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        # the XPBD solver's spring coloring, cached the same way as the islands
+        key = (self.particle_count, self.spring_count)
+        if key != self._colors_key:
+            m = self.spring_count
+            self._spring_colors = spring_colors(self.particle_count, self.spring_a[:m], self.spring_b[:m])
+            self._colors_key = key
+        return self._spring_colors
+
+    def islands(self) -> list[np.ndarray]:
+        labels = self.island_labels()
+        order = np.argsort(labels, kind="stable")
+        return np.split(order, np.flatnonzero(np.diff(labels[order])) + 1)
+
+    # SIMULATION
+
+    def drag_factor(self, dt: float) -> float:
+        return self.drag_per_second ** (dt * self.TIME_UNIT)
+
+    def apply_force(self, force=(0, 0.1)):
+        # uniform, e.g. gravity: leaves sleeping islands asleep, toggling gravity wakes everything instead
+        self.force[:self.particle_count] += force
+
+    def apply_force_at(self, particles, force):
+        # a push on some particles wakes the islands they belong to
+        np.add.at(self.force, particles, force)
+        if self.sleeping: self.wake_particles(particles)
+
+    def accumulate_spring_forces(self):
+        n, m = self.particle_count, self.spring_count
+        if m == 0: return
+        accumulate_spring_forces(self.pos[:n], self.velocity[:n], self.force[:n], self.spring_a[:m], self.spring_b[:m],
+                                 self.k[:m], self.damping[:m], self.rest_len[:m])
+
+    def integrate(self, dt: float):
+        n = self.particle_count
+        integrate(self.pos[:n], self.velocity[:n], self.force[:n], self.fixed[:n], dt, self.drag_factor(dt))
+
+    # SELF COLLISION
+
+    def find_close_pairs(self) -> tuple[np.ndarray, np.ndarray]:
+        n = self.particle_count
+        empty = np.zeros(0, dtype=np.intp)
+        if n < 2: return empty, empty
+        pos, radius = self.pos[:n], self.radius[:n]
+
+        # cell list: cells are one particle diameter wide, so touching pairs are at most one cell apart
+        cell_size = 2 * radius.max()
+        cells = np.floor(pos / cell_size).astype(np.int64)
+        cells -= cells.min(axis=0) - 1
+        width = cells[:, 0].max() + 2
+        keys = cells[:, 0] + cells[:, 1] * width
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        all_i, all_j = [], []
+        for dx, dy in self.NEIGHBOR_CELLS:
+            target = keys + dx + dy * width
+            start = np.searchsorted(sorted_keys, target, "left")
+            counts = np.searchsorted(sorted_keys, target, "right") - start
+            total = counts.sum()
+            if total == 0: continue
+            i = np.repeat(np.arange(n), counts)
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            j = order[np.repeat(start, counts) + offsets]
+            if dx == dy == 0:
+                keep = i < j
+                i, j = i[keep], j[keep]
+            all_i.append(i)
+            all_j.append(j)
+        if not all_i: return empty, empty
+
+        i, j = np.concatenate(all_i), np.concatenate(all_j)
+        delta = pos[i] - pos[j]
+        reach = radius[i] + radius[j]
+        close = np.einsum("ij,ij->i", delta, delta) < reach * reach
+        return i[close], j[close]
+
+    def solve_self_collisions(self):
+        n = self.particle_count
+        for _ in range(self.collision_iterations):
+            i, j = self.find_close_pairs()
+            awake = self.awake_particles()
+            if awake is not None:
+                # a moving body touching a sleeping one wakes it, two sleeping ones stay put
+                self.wake_particles(np.concatenate([i[awake[j]], j[awake[i]]]))
+                awake = self.awake_particles()
+                if awake is not None:
+                    keep = awake[i] | awake[j]
+                    i, j = i[keep], j[keep]
+            if len(i) == 0: return
+            self.profiler.count("self_collision_pairs", len(i))
+            delta = self.pos[i] - self.pos[j]
+            dist = np.hypot(delta[:, 0], delta[:, 1])
+            coincident = dist == 0
+            delta[coincident] = (1, 0)
+            dist[coincident] = 1
+            normal = delta / dist[:, None]
+            overlap = self.radius[i] + self.radius[j] - dist
+
+            # split the push evenly, a fixed particle gives its share to the other one
+            wi = (~self.fixed[i]).astype(float)
+            wj = (~self.fixed[j]).astype(float)
+            total = wi + wj
+            share = np.divide(overlap, total, out=np.zeros_like(overlap), where=total > 0)
+            for axis in (0, 1):
+                push = normal[:, axis] * share
+                self.pos[:n, axis] += np.bincount(i, push * wi, minlength=n) - np.bincount(j, push * wj, minlength=n)
+
+    # SLEEPING
+
+    def sync_sleep_state(self):
+        labels = self.island_labels()
+        if self._sleep_key == self._islands_key: return labels
+        # topology changed, islands were relabelled: everyone starts awake
+        count = labels.max() + 1 if len(labels) else 0
+        self.island_asleep = np.zeros(count, dtype=bool)
+        self.island_rest_time = np.zeros(count)
+        self.island_bounds = np.zeros((count, 4))
+        self.asleep[:self.particle_count] = False
+        self._sleep_key = self._islands_key
+        return labels
+
+    def awake_particles(self) -> np.ndarray | None:
+        # mask of particles being simulated, None when nothing is asleep
+        if not self.sleeping or not self.island_asleep.any(): return None
+        self.sync_sleep_state()
+        return ~self.asleep[:self.particle_count]
+
+    def wake_islands(self, islands):
+        self.island_asleep[islands] = False
+        self.island_rest_time[islands] = 0
+        self.asleep[:self.particle_count] = self.island_asleep[self.island_labels()]
+
+    def wake_particles(self, particles):
+        if not self.island_asleep.any(): return
+        self.wake_islands(self.sync_sleep_state()[particles])
+
+    def wake_all(self):
+        self.wake_islands(slice(None))
+
+    def wake_in_box(self, left, top, right, bottom):
+        asleep = self.island_asleep
+        if not asleep.any(): return
+        b = self.island_bounds
+        self.wake_islands(asleep & (b[:, 0] <= right) & (b[:, 2] >= left) & (b[:, 1] <= bottom) & (b[:, 3] >= top))
+
+    def update_sleep(self, dt: float):
+        labels = self.sync_sleep_state()
+        n = self.particle_count
+        if n == 0: return
+        count = len(self.island_asleep)
+        speed_sq = (self.velocity[:n] ** 2).sum(axis=1)
+        energy = 0.5 * np.bincount(labels, speed_sq, minlength=count) / np.bincount(labels, minlength=count)
+
+        resting = energy < self.sleep_energy
+        self.island_rest_time = np.where(resting, self.island_rest_time + dt, 0)
+        falling_asleep = ~self.island_asleep & (self.island_rest_time >= self.sleep_delay)
+        if not falling_asleep.any(): return
+
+        self.island_asleep |= falling_asleep
+        members = falling_asleep[labels]
+        self.asleep[:n] |= members
+        self.velocity[:n][members] = 0
+        lo = self.pos[:n] - self.radius[:n, None]
+        hi = self.pos[:n] + self.radius[:n, None]
+        bounds = np.full((count, 4), np.inf)
+        bounds[:, 2:] = -np.inf
+        np.minimum.at(bounds[:, :2], labels[members], lo[members])
+        np.maximum.at(bounds[:, 2:], labels[members], hi[members])
+        self.island_bounds[falling_asleep] = bounds[falling_asleep]
+
+    def step(self, dt: float):
+        # judged on the velocities left by the previous step, after any external collision stage
+        if self.sleeping: self.update_sleep(dt)
+        awake = self.awake_particles()
+        profiler = self.profiler
+        if self.solver == "xpbd":
+            n, m = self.particle_count, self.spring_count
+            held = self.fixed[:n] if awake is None else self.fixed[:n] | ~awake
+            with profiler.stage("constraints"):
+                xpbd_step(self.pos[:n], self.velocity[:n], self.force[:n], held, self.spring_a[:m], self.spring_b[:m],
+                          self.k[:m], self.damping[:m], self.rest_len[:m], dt, self.drag_factor(dt), self.solver_iterations,
+                          None if JIT else self.spring_colors())
+            profiler.count("springs", m)
+        elif awake is None:
+            with profiler.stage("forces"): self.accumulate_spring_forces()
+            with profiler.stage("integrate"): self.integrate(dt)
+            profiler.count("springs", self.spring_count)
+        else:
+            n, m = self.particle_count, self.spring_count
+            active = np.flatnonzero(awake)
+            springs = awake[self.spring_a[:m]]
+            with profiler.stage("forces"):
+                accumulate_spring_forces(self.pos[:n], self.velocity[:n], self.force[:n], self.spring_a[:m][springs], self.spring_b[:m][springs],
+                                         self.k[:m][springs], self.damping[:m][springs], self.rest_len[:m][springs])
+            with profiler.stage("integrate"):
+                pos, velocity, force = self.pos[active], self.velocity[active], self.force[active]
+                integrate(pos, velocity, force, self.fixed[active], dt, self.drag_factor(dt))
+                self.pos[active] = pos
+                self.velocity[active] = velocity
+                self.force[:n] = 0
+            profiler.count("springs", int(springs.sum()))
+        if self.self_collision:
+            with profiler.stage("self_collision"): self.solve_self_collisions()
+
+
+
+# ===== Lightweight handles =====
+# For bodies too large for a sprite per particle: no surface, no group bookkeeping,
+# just an index into the world arrays. Vector fields are writable row views; classes.ParticleCollider
+# builds on this to collide as a circle. Springs need no handle, a scene never touches them one by one.
+
+class ParticleRef:
+    __slots__ = ("world", "index")
+
+    def __init__(self, world: SoftBodyWorld, index: int):
+        self.world = world
+        self.index = index
+
+    @property
+    def pos(self) -> np.ndarray: return self.world.pos[self.index]
+    @pos.setter
+    def pos(self, value): self.world.pos[self.index] = value
+
+    @property
+    def velocity(self) -> np.ndarray: return self.world.velocity[self.index]
+    @velocity.setter
+    def velocity(self, value): self.world.velocity[self.index] = value
+
+    @property
+    def force(self) -> np.ndarray: return self.world.force[self.index]
+    @force.setter
+    def force(self, value): self.world.force[self.index] = value
+
+    @property
+    def radius(self) -> float: return float(self.world.radius[self.index])
+    @radius.setter
+    def radius(self, value): self.world.radius[self.index] = value
+
+    @property
+    def fixed(self) -> bool: return bool(self.world.fixed[self.index])
+    @fixed.setter
+    def fixed(self, value): self.world.fixed[self.index] = value
+
+    def apply_force(self, force):
+        self.world.apply_force_at(self.index, force)